@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Any, Optional, Iterable
+from io_registry import IO_REGISTRY
+from analyzer import IOOperation
+
+# Bump whenever analyze_file's output changes, so old cache files are dropped wholesale.
+# Changes to the registered I/O patterns invalidate the cache through their fingerprint.
+CACHE_VERSION = 2
+
+class AnalysisCache:
+    """
+    Persistent cache of analyze_file() results, keyed by file path.
+
+    An entry is reused when the file's mtime and size are unchanged (no read needed);
+    otherwise the file content is hashed and the entry is reused only if the hash
+    still matches. Entries whose content changed, that can't be decoded, or whose
+    file wasn't seen in the last run are evicted.
+    """
+
+    def __init__(self, output_dir: str = "output_files", filename: str = "analysis_cache.json"):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(exist_ok=True)
+        self.cache_path = self.output_dir / filename
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._pending: Dict[str, tuple] = {}  # path -> (mtime_ns, size, digest) of a miss
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        self.io_patterns = IO_REGISTRY.fingerprint()
+        self._load()
+
+    def _load(self):
+        """Load the cache file, starting empty if it is missing, corrupt or outdated."""
+        if not self.cache_path.exists():
+            return
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if (data.get("version") == CACHE_VERSION and data.get("io_patterns") == self.io_patterns
+                    and isinstance(data.get("entries"), dict)):
+                self.entries = data["entries"]
+                return
+        except (OSError, ValueError, AttributeError):
+            pass
+        # Unreadable, or from another analyzer version / I/O pattern set: evict everything
+        self._dirty = True
+
+    @staticmethod
+    def hash_content(data: bytes) -> str:
+        """The content hash entries are keyed by, for a file's raw bytes."""
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+    @classmethod
+    def _hash_file(cls, file_path: str) -> str:
+        with open(file_path, 'rb') as f:
+            return cls.hash_content(f.read())
+
+    @staticmethod
+    def _encode(analysis_result: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert an analyze_file() result to JSON-safe form (sets -> sorted lists, IOOperation -> list)."""
+        encoded = dict(analysis_result)
+        encoded["imports"] = {m: sorted(s) for m, s in analysis_result["imports"].items()}
+        encoded["function_usage"] = {m: sorted(s) for m, s in analysis_result["function_usage"].items()}
+        return encoded
+
+    @staticmethod
+    def _decode(encoded: Dict[str, Any]) -> Dict[str, Any]:
+        """Inverse of _encode()."""
+        result = dict(encoded)
+        result["imports"] = {m: set(s) for m, s in encoded["imports"].items()}
+        result["function_usage"] = {m: set(s) for m, s in encoded["function_usage"].items()}
+        if encoded.get("io_operations") is not None:
+            result["io_operations"] = [IOOperation(*op) for op in encoded["io_operations"]]
+        return result
+
+    def get_unchanged(self, file_path: str, st: Optional[os.stat_result] = None) -> Optional[Dict[str, Any]]:
+        """
+        The fast half of get(): the cached analysis if file_path's mtime and size are
+        unchanged, without reading the file. A None is not counted as a miss; call get()
+        (with the content hash, once the file is read anyway) to settle it.
+        """
+        if st is None:
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                return None
+        entry = self.entries.get(file_path)
+        try:
+            if entry is not None and entry["mtime"] == st.st_mtime_ns and entry["size"] == st.st_size:
+                result = self._decode(entry["result"])
+                self.hits += 1
+                return result
+        except (KeyError, TypeError, AttributeError):
+            pass
+        return None
+
+    def expected_hash(self, file_path: str) -> Optional[str]:
+        """Content hash of the cached entry for file_path, if any."""
+        entry = self.entries.get(file_path)
+        return entry.get("hash") if isinstance(entry, dict) else None
+
+    def get(self, file_path: str, st: Optional[os.stat_result] = None,
+            digest: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached analysis for file_path, or None if it must be re-analyzed.
+        st is the file's os.stat_result if the caller already has it (e.g. from discovery),
+        digest its content hash (hash_content) if the caller already read it.
+        """
+        if st is None:
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                self._evict(file_path)
+                return None
+        entry = self.entries.get(file_path)
+        try:
+            if entry is not None:
+                if entry["mtime"] == st.st_mtime_ns and entry["size"] == st.st_size:
+                    result = self._decode(entry["result"])
+                    self.hits += 1
+                    return result
+                if digest is None:
+                    digest = self._hash_file(file_path)
+                if entry["hash"] == digest:
+                    # Touched but not modified: refresh the fast-check fields
+                    result = self._decode(entry["result"])
+                    entry["mtime"], entry["size"] = st.st_mtime_ns, st.st_size
+                    self._dirty = True
+                    self.hits += 1
+                    return result
+            elif digest is None:
+                digest = self._hash_file(file_path)
+        except (KeyError, TypeError, AttributeError):
+            # Corrupt entry
+            digest = None
+        except OSError:
+            return None
+        self._evict(file_path)
+        self._pending[file_path] = (st.st_mtime_ns, st.st_size, digest)
+        self.misses += 1
+        return None
+
+    def put(self, file_path: str, analysis_result: Dict[str, Any]):
+        """Store a fresh analysis for file_path."""
+        pending = self._pending.pop(file_path, None)
+        try:
+            if pending is None or pending[2] is None:
+                st = os.stat(file_path)
+                pending = (st.st_mtime_ns, st.st_size, self._hash_file(file_path))
+        except OSError:
+            return
+        mtime, size, digest = pending
+        self.entries[file_path] = {
+            "mtime": mtime,
+            "size": size,
+            "hash": digest,
+            "result": self._encode(analysis_result)
+        }
+        self._dirty = True
+
+    def _evict(self, file_path: str):
+        if self.entries.pop(file_path, None) is not None:
+            self._dirty = True
+
+    def prune(self, live_paths: Iterable[str]):
+        """Evict entries for files that are no longer part of the codebase."""
+        live = set(live_paths)
+        for file_path in [p for p in self.entries if p not in live]:
+            self._evict(file_path)
+
+    def save(self):
+        """Write the cache back to disk if anything changed."""
+        if not self._dirty:
+            return self.cache_path
+        tmp_path = self.cache_path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": CACHE_VERSION, "io_patterns": self.io_patterns, "entries": self.entries}, f)
+        os.replace(tmp_path, self.cache_path)
+        self._dirty = False
+        return self.cache_path
@@ -1,70 +1,106 @@
 import ast
 import os
-from typing import Dict, Set, Any, Tuple, List
+import re
+from collections import deque
+from typing import Dict, Set, Any, List, NamedTuple, Union
+from io_registry import IO_REGISTRY, DEFAULT_CATEGORY
 
 class AnalyzeError(Exception):
     pass
 
-def analyze_file(file_path: str) -> Dict[str, Any]:
-    """
-    Analyze a Python file for imports, file I/O calls, and function/class usage from imported modules.
+class IOOperation(NamedTuple):
+    """One detected I/O call."""
+    operation: str  # e.g. "json.load", "open()", "Path.open()", "DataLoader()"
+    line: int
+    col: int
+    category: str  # I/O registry category, e.g. "json", "file", "ml"
 
-    Args:
-        file_path: Path to the Python file to analyze
+def format_io_operation(op: IOOperation) -> str:
+    """Human-readable form, e.g. "json.load at line 12"."""
+    return f"{op.operation} at line {op.line}"
 
-    Returns:
-        Dict containing:
-        - imports: dict mapping module -> set of import statements
-        - io_call_count: total number of file I/O calls detected
-        - function_usage: dict mapping module -> set of used functions/classes
-        - io_operations: list of specific I/O operations found
-        - file_info: basic file information
+def io_operation_category(operation: str) -> str:
+    """Category of an operation name as recorded by the analyzer, e.g. "open()" -> "file"."""
+    if operation.endswith("()"):
+        operation = operation[:-2]
+        if operation in _ML_IO_CALLS:
+            return "ml"
+    return IO_REGISTRY.category(operation) or DEFAULT_CATEGORY
+
+def _leaf_types() -> Set[type]:
+    """Node types whose subtrees can never contain a call or attribute access."""
+    leaves = {ast.Constant, ast.Name, ast.alias, ast.Pass, ast.Break, ast.Continue,
+              ast.Global, ast.Nonlocal, ast.Import, ast.ImportFrom}
+    pending = [ast.expr_context, ast.operator, ast.unaryop, ast.cmpop, ast.boolop]
+    while pending:
+        cls = pending.pop()
+        leaves.add(cls)
+        pending.extend(cls.__subclasses__())
+    return leaves
+
+# Nested imports are not analyzed (only top-level ones are), so they count as leaves too
+_LEAF_TYPES = frozenset(_leaf_types())
+_ML_IO_CALLS = {name: f"{name}()" for name in ("DataLoader", "load_model", "save_model")}
+_OPEN_CATEGORY = IO_REGISTRY.category("open") or "file"
+_PATH_OPEN_CATEGORY = IO_REGISTRY.category("Path.open") or "pathlib"
+
+class _FileVisitor:
+    """
+    Single-pass analysis engine: one breadth-first traversal of the tree collects imports,
+    attribute usage and I/O calls, dispatching on node type through _DISPATCH and never
+    descending into subtrees that can't contain anything of interest.
+
+    Top-level imports are all seen before any expression (they sit at depth 1 of the
+    breadth-first order), so usage is always resolved against the complete alias map.
     """
-    # Initialize data structures
-    imports: Dict[str, Set[str]] = {}
-    alias_map: Dict[str, str] = {}  # alias -> real module name
-    io_call_count: int = 0
-    function_usage: Dict[str, Set[str]] = {}  # module -> set of used functions/classes
-    io_operations: List[str] = []  # List of specific I/O operations found
-
-    def _record_import(module: str, stmt: str) -> None:
+    __slots__ = ("imports", "alias_map", "io_call_count", "function_usage", "io_operations")
+
+    def __init__(self):
+        self.imports: Dict[str, Set[str]] = {}
+        self.alias_map: Dict[str, str] = {}  # alias -> real module name
+        self.io_call_count: int = 0
+        self.function_usage: Dict[str, Set[str]] = {}  # module -> set of used functions/classes
+        self.io_operations: List[IOOperation] = []  # List of specific I/O operations found
+
+    def _record_import(self, module: str, stmt: str) -> None:
         """Record an import statement for a module."""
-        imports.setdefault(module, set()).add(stmt)
-        function_usage.setdefault(module, set())
+        self.imports.setdefault(module, set()).add(stmt)
+        self.function_usage.setdefault(module, set())
 
-    def _record_function_usage(module: str, function_name: str) -> None:
+    def _record_function_usage(self, module: str, function_name: str) -> None:
         """Record a function/class usage from a module."""
-        if module in function_usage:
-            function_usage[module].add(function_name)
+        if module in self.function_usage:
+            self.function_usage[module].add(function_name)
 
-    def _record_io_operation(operation: str) -> None:
+    def _record_io_operation(self, operation: str, node: ast.AST, category: str) -> None:
         """Record a specific I/O operation."""
-        io_operations.append(operation)
+        self.io_call_count += 1
+        self.io_operations.append(IOOperation(operation, node.lineno, node.col_offset, category))
 
-    def _handle_import(node: ast.Import) -> None:
+    def _visit_import(self, node: ast.Import) -> None:
         """Handle direct imports (import x)."""
         for alias in node.names:
             real_mod = alias.name
             asname = alias.asname or alias.name
-            alias_map[asname] = real_mod
+            self.alias_map[asname] = real_mod
             stmt = f"import {real_mod}" if asname == real_mod else f"import {real_mod} as {asname}"
-            _record_import(real_mod, stmt)
+            self._record_import(real_mod, stmt)
 
-    def _handle_import_from(node: ast.ImportFrom) -> None:
+    def _visit_import_from(self, node: ast.ImportFrom) -> None:
         """Handle from imports (from x import y)."""
         module = node.module or ""
         
         # Handle future imports
         if module == "__future__":
             for alias in node.names:
-                _record_import("__future__", f"from __future__ import {alias.name}")
-                _record_function_usage("__future__", alias.name)
+                self._record_import("__future__", f"from __future__ import {alias.name}")
+                self._record_function_usage("__future__", alias.name)
             return
 
         # Handle star imports
         if any(alias.name == "*" for alias in node.names):
-            _record_import(module, f"from {module} import *")
-            _record_function_usage(module, "ALL")
+            self._record_import(module, f"from {module} import *")
+            self._record_function_usage(module, "ALL")
             return
 
         # Handle regular from imports
@@ -74,105 +110,208 @@ def analyze_file(file_path: str) -> Dict[str, Any]:
             # Handle relative imports
             if module.startswith('.'):
                 module = f"<relative>{module}"
-            alias_map[asname] = f"{module}.{real_name}" if module else real_name
+            self.alias_map[asname] = f"{module}.{real_name}" if module else real_name
             stmt = f"from {module} import {real_name}"
             if alias.asname:
                 stmt += f" as {alias.asname}"
-            _record_import(module or "<local>", stmt)
-            _record_function_usage(module or "<local>", real_name)
-
-    def _is_io_operation(full_name: str) -> bool:
-        """Check if a function call is an I/O operation."""
-        io_patterns = {
-            # Basic file operations
-            "open", "gzip.open", "bz2.open", "lzma.open",
-            # CSV operations
-            "csv.reader", "csv.writer", "csv.DictReader", "csv.DictWriter",
-            # JSON operations
-            "json.load", "json.dump", "json.loads", "json.dumps",
-            # Pickle operations
-            "pickle.load", "pickle.dump", "pickle.loads", "pickle.dumps",
-            # Pandas operations
-            "pandas.read_csv", "pandas.read_json", "pandas.read_excel",
-            "pandas.read_parquet", "pandas.read_feather", "pandas.read_hdf",
-            "pandas.read_sql", "pandas.read_html", "pandas.read_xml",
-            "pandas.to_csv", "pandas.to_json", "pandas.to_excel",
-            "pandas.to_parquet", "pandas.to_feather", "pandas.to_hdf",
-            "pandas.to_sql", "pandas.to_html", "pandas.to_xml",
-            # PyTorch operations
-            "torch.load", "torch.save", "torch.load_state_dict", "torch.save_state_dict",
-            "torch.utils.data.DataLoader",
-            # NumPy operations
-            "numpy.load", "numpy.save", "numpy.loadtxt", "numpy.savetxt",
-            "numpy.fromfile", "numpy.tofile", "numpy.genfromtxt",
-            # Pathlib operations
-            "Path.open", "Path.read_text", "Path.write_text",
-            "Path.read_bytes", "Path.write_bytes", "Path.mkdir",
-            "Path.rmdir", "Path.unlink", "Path.touch",
-            # IO module operations
-            "io.open", "io.StringIO", "io.BytesIO", "io.TextIOWrapper",
-            # Shutil operations
-            "shutil.copy", "shutil.copy2", "shutil.copyfile",
-            "shutil.copytree", "shutil.move", "shutil.rmtree",
-            # Zipfile operations
-            "zipfile.ZipFile", "zipfile.PyZipFile", "zipfile.open",
-            # Tarfile operations
-            "tarfile.open", "tarfile.TarFile",
-            # Database operations
-            "sqlite3.connect", "sqlite3.connect", "sqlalchemy.create_engine",
-            # Network operations
-            "requests.get", "requests.post", "requests.put", "requests.delete",
-            "urllib.request.urlopen", "urllib.request.urlretrieve",
-            # Configuration operations
-            "configparser.ConfigParser.read", "configparser.ConfigParser.write",
-            "yaml.safe_load", "yaml.dump", "yaml.safe_dump",
-            "toml.load", "toml.dump", "toml.loads", "toml.dumps",
-            # Image operations
-            "PIL.Image.open", "PIL.Image.save", "cv2.imread", "cv2.imwrite",
-            # Audio operations
-            "librosa.load", "librosa.output.write_wav",
-            # Machine Learning operations
-            "sklearn.model_selection.load_svmlight_file",
-            "joblib.load", "joblib.dump",
-            # HDF5 operations
-            "h5py.File", "h5py.Group.create_dataset", "h5py.Dataset.read",
-            # Excel operations
-            "openpyxl.load_workbook", "openpyxl.Workbook.save",
-            # XML operations
-            "xml.etree.ElementTree.parse", "xml.etree.ElementTree.write",
-            "lxml.etree.parse", "lxml.etree.write",
-            # PDF operations
-            "PyPDF2.PdfReader", "PyPDF2.PdfWriter.write",
-            # Archive operations
-            "rarfile.RarFile", "rarfile.RarFile.extract",
-            # Cloud storage operations
-            "boto3.client", "google.cloud.storage.Client",
-            "azure.storage.blob.BlobServiceClient",
-            # Streamlit operations
-            "streamlit.file_uploader", "streamlit.download_button",
-            # Matplotlib operations
-            "matplotlib.pyplot.savefig", "matplotlib.pyplot.imsave",
-            # Plotly operations
-            "plotly.io.write_html", "plotly.io.write_image",
-            # Seaborn operations
-            "seaborn.savefig",
-            # Altair operations
-            "altair.save", "altair.renderer.save"
+            self._record_import(module or "<local>", stmt)
+            self._record_function_usage(module or "<local>", real_name)
+
+    def _visit_call(self, node: ast.Call) -> None:
+        """Handle function calls: builtin open(), pathlib and module.method() I/O, ML helpers."""
+        func = node.func
+        # Handle basic open() call
+        if isinstance(func, ast.Name):
+            if func.id == "open":
+                self._record_io_operation("open()", node, _OPEN_CATEGORY)
+            # Handle DataLoader instantiation and other ML operations
+            elif func.id in _ML_IO_CALLS:
+                self._record_io_operation(_ML_IO_CALLS[func.id], node, "ml")
+        
+        # Handle pathlib.Path.open() and other pathlib operations
+        elif isinstance(func, ast.Attribute):
+            base = func.value
+            if isinstance(base, ast.Attribute):
+                if isinstance(base.value, ast.Name):
+                    if base.value.id == "Path" and func.attr == "open":
+                        self._record_io_operation("Path.open()", node, _PATH_OPEN_CATEGORY)
+            
+            # Handle module.method() calls
+            elif isinstance(base, ast.Name):
+                real_mod = self.alias_map.get(base.id, base.id)
+                self._record_function_usage(real_mod, func.attr)
+                
+                # Check for I/O operations
+                category = IO_REGISTRY.matches(real_mod, func.attr)
+                if category is not None:
+                    self._record_io_operation(f"{real_mod}.{func.attr}", node, category)
+
+    def _visit_attribute(self, node: ast.Attribute) -> None:
+        """Track attribute access (e.g., pd.DataFrame, torch.tensor)."""
+        if isinstance(node.value, ast.Name):
+            real_mod = self.alias_map.get(node.value.id, node.value.id)
+            self._record_function_usage(real_mod, node.attr)
+
+    def visit(self, tree: ast.Module) -> None:
+        """Run the single traversal over a parsed module."""
+        dispatch = _DISPATCH
+        leaf_types = _LEAF_TYPES
+        queue = deque()
+        push = queue.append
+
+        def push_children(node):
+            for name in node._fields:
+                field = getattr(node, name, None)
+                if isinstance(field, list):
+                    for item in field:
+                        if isinstance(item, ast.AST) and type(item) not in leaf_types:
+                            push(item)
+                elif isinstance(field, ast.AST) and type(field) not in leaf_types:
+                    push(field)
+
+        # Depth 1: the only place where imports are analyzed
+        for node in tree.body:
+            node_type = type(node)
+            if node_type is ast.Import:
+                self._visit_import(node)
+            elif node_type is ast.ImportFrom:
+                self._visit_import_from(node)
+            elif node_type not in leaf_types:
+                push(node)
+
+        while queue:
+            node = queue.popleft()
+            handler = dispatch.get(type(node))
+            if handler is not None:
+                handler(self, node)
+            push_children(node)
+
+    def result(self) -> Dict[str, Any]:
+        return {
+            "imports": self.imports,
+            "io_call_count": self.io_call_count,
+            "function_usage": self.function_usage,
+            "io_operations": self.io_operations,
         }
-        return full_name in io_patterns
 
-    def _get_node_location(node: ast.AST) -> str:
-        """Get the line number of an AST node."""
-        return f"line {getattr(node, 'lineno', 'unknown')}"
+_DISPATCH = {
+    ast.Call: _FileVisitor._visit_call,
+    ast.Attribute: _FileVisitor._visit_attribute,
+}
+
+# One left-to-right C-level scan that steps over strings and comments and stops at every
+# statement starting with import/from in column 0 (i.e. at module level). An import after a
+# ";" can't be classified without parsing the line, so it forces a full parse.
+_IMPORT_SCAN = re.compile(
+    r"(?P<skip>'''(?:\\[\s\S]|[^\\])*?'''"
+    r'|"""(?:\\[\s\S]|[^\\])*?"""'
+    r"|'(?:\\[\s\S]|[^'\\\n])*'"
+    r'|"(?:\\[\s\S]|[^"\\\n])*"'
+    r"|#[^\n]*)"
+    r"|(?P<stmt>^(?:import|from)\b)"
+    r"|(?P<semicolon>;[ \t]*(?:import|from)\b)",
+    re.M,
+)
+_STATEMENT_BREAK = re.compile(r"[()#;\\\n]")
 
+def _statement_end(source: str, start: int) -> int:
+    """Index just past the import statement starting at start (brackets and \\ continue it)."""
+    depth = 0
+    pos = start
+    while True:
+        match = _STATEMENT_BREAK.search(source, pos)
+        if match is None:
+            return len(source)
+        char = match.group()
+        pos = match.end()
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "#":
+            newline = source.find("\n", pos)
+            if newline < 0:
+                return len(source)
+            pos = newline
+        elif char == "\\":
+            pos += 2 if source.startswith("\r\n", pos) else 1  # skip the escaped newline
+        elif depth <= 0:
+            return match.start()
+
+def _scan_imports(source: str, file_path: str, visitor: "_FileVisitor") -> None:
+    """Feed the module-level import statements of source to the visitor without parsing the rest."""
+    if source.startswith("\ufeff"):
+        # A byte-order mark keeps a first-line import from matching: parse it all, as a full analysis does
+        statements = None
+    else:
+        statements = []
+        for match in _IMPORT_SCAN.finditer(source):
+            if match.lastgroup == "stmt":
+                start = match.start()
+                statements.append(source[start:_statement_end(source, start)])
+            elif match.lastgroup == "semicolon":
+                statements = None
+                break
+    if statements is None:
+        body = ast.parse(source, filename=file_path).body
+    elif not statements:
+        return
+    else:
+        try:
+            body = ast.parse("\n".join(statements), filename=file_path).body
+        except SyntaxError:
+            # Something the scan can't classify (e.g. nested quotes in an f-string): parse it all
+            body = ast.parse(source, filename=file_path).body
+    for node in body:
+        if isinstance(node, ast.Import):
+            visitor._visit_import(node)
+        elif isinstance(node, ast.ImportFrom):
+            visitor._visit_import_from(node)
+
+def analyze_file(file_path: str, imports_only: bool = False) -> Dict[str, Any]:
+    """
+    Analyze a Python file for imports, file I/O calls, and function/class usage from imported modules.
+
+    Args:
+        file_path: Path to the Python file to analyze
+        imports_only: Only extract module-level imports, with a text scan instead of a full
+            parse. "imports" is the same as in a full analysis, function_usage only holds the
+            names imported with from-imports, and no I/O is reported. The rest of the file
+            is not syntax checked.
+
+    Returns:
+        Dict containing:
+        - imports: dict mapping module -> set of import statements
+        - io_call_count: total number of file I/O calls detected
+        - function_usage: dict mapping module -> set of used functions/classes
+        - io_operations: list of IOOperation records (operation, line, col, category)
+        - file_info: basic file information
+    """
     try:
         # Check if file exists
         if not os.path.exists(file_path):
             raise AnalyzeError(f"File not found: {file_path}")
         
-        # Read and parse the file
-        with open(file_path, 'r', encoding='utf-8') as f:
-            source = f.read()
+        with open(file_path, 'rb') as f:
+            data = f.read()
+    except Exception as e:
+        raise AnalyzeError(f"Error analyzing {file_path}: {e}")
+    return analyze_source(data, file_path, imports_only=imports_only)
+
+def decode_source(data: bytes) -> str:
+    """Decode file content the way open(file_path, 'r', encoding='utf-8') reads it (universal newlines)."""
+    source = data.decode('utf-8')
+    if '\r' in source:
+        source = source.replace('\r\n', '\n').replace('\r', '\n')
+    return source
+
+def analyze_source(data: Union[bytes, str], file_path: str, imports_only: bool = False) -> Dict[str, Any]:
+    """
+    analyze_file() for content that was already read: the raw bytes of file_path (decoded
+    with decode_source) or its text. Raises AnalyzeError just like analyze_file().
+    """
+    try:
+        source = decode_source(data) if isinstance(data, bytes) else data
         
         if not source.strip():
             return {
@@ -188,56 +327,11 @@ def analyze_file(file_path: str) -> Dict[str, Any]:
                 }
             }
         
-        tree = ast.parse(source, filename=file_path)
-        
-        # First pass: Process all imports
-        for node in tree.body:
-            if isinstance(node, ast.Import):
-                _handle_import(node)
-            elif isinstance(node, ast.ImportFrom):
-                _handle_import_from(node)
-
-        # Second pass: Process function calls and attribute access
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Call):
-                # Handle basic open() call
-                if isinstance(node.func, ast.Name) and node.func.id == "open":
-                    io_call_count += 1
-                    _record_io_operation(f"open() at {_get_node_location(node)}")
-                
-                # Handle pathlib.Path.open() and other pathlib operations
-                elif isinstance(node.func, ast.Attribute):
-                    if isinstance(node.func.value, ast.Attribute):
-                        if isinstance(node.func.value.value, ast.Name):
-                            if node.func.value.value.id == "Path" and node.func.attr == "open":
-                                io_call_count += 1
-                                _record_io_operation(f"Path.open() at {_get_node_location(node)}")
-                    
-                    # Handle module.method() calls
-                    base = node.func.value
-                    if isinstance(base, ast.Name):
-                        alias = base.id
-                        real_mod = alias_map.get(alias, alias)
-                        full = f"{real_mod}.{node.func.attr}"
-                        _record_function_usage(real_mod, node.func.attr)
-                        
-                        # Check for I/O operations
-                        if _is_io_operation(full):
-                            io_call_count += 1
-                            _record_io_operation(f"{full} at {_get_node_location(node)}")
-                
-                # Handle DataLoader instantiation and other ML operations
-                elif isinstance(node.func, ast.Name):
-                    if node.func.id in ["DataLoader", "load_model", "save_model"]:
-                        io_call_count += 1
-                        _record_io_operation(f"{node.func.id}() at {_get_node_location(node)}")
-
-            # Track attribute access (e.g., pd.DataFrame, torch.tensor)
-            elif isinstance(node, ast.Attribute):
-                if isinstance(node.value, ast.Name):
-                    alias = node.value.id
-                    real_mod = alias_map.get(alias, alias)
-                    _record_function_usage(real_mod, node.attr)
+        visitor = _FileVisitor()
+        if imports_only:
+            _scan_imports(source, file_path, visitor)
+        else:
+            visitor.visit(ast.parse(source, filename=file_path))
 
         # Get file information
         file_info = {
@@ -246,14 +340,12 @@ def analyze_file(file_path: str) -> Dict[str, Any]:
             "lines": len(source.splitlines()),
             "empty": False
         }
+        if imports_only:
+            file_info["imports_only"] = True
 
-        return {
-            "imports": imports,
-            "io_call_count": io_call_count,
-            "function_usage": function_usage,
-            "io_operations": io_operations,
-            "file_info": file_info
-        }
+        result = visitor.result()
+        result["file_info"] = file_info
+        return result
     except SyntaxError as e:
         raise AnalyzeError(f"Syntax error in {file_path} at line {e.lineno}: {e.text}")
     except UnicodeDecodeError as e:
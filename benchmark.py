@@ -0,0 +1,194 @@
+"""
+Benchmarks for the dependency store, run on synthetic analysis results:
+
+    python benchmark.py memory --files 100000
+    python benchmark.py build --files 5000 10000 20000 40000
+    python benchmark.py save --files 5000 20000
+    python benchmark.py snapshot --files 50000
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from analyzer import IOOperation, format_io_operation
+from dependency_store import DependencyStore
+
+def _fresh(name):
+    """A new string object with the same value, as produced by unpickled or cached results."""
+    return (name + " ")[:-1]
+
+def synthetic_results(num_files, seed=0):
+    """Yield (file_path, analysis_result) pairs shaped like analyze_file() output."""
+    rng = random.Random(seed)
+    modules = [f"pkg{i // 20}.mod{i}" for i in range(400)] + ["sys", "json", "typing", "numpy", "pandas"]
+    symbols = [f"func_{i}" for i in range(300)]
+    for i in range(num_files):
+        path = f"src/pkg{i % 50}/file_{i}.py"
+        # every file imports "os", like a real codebase's hottest modules
+        imported = ["os"] + rng.sample(modules, rng.randint(2, 11))
+        imports = {_fresh(m): {f"import {m}"} for m in imported}
+        function_usage = {_fresh(m): {_fresh(s) for s in rng.sample(symbols, rng.randint(0, 6))} for m in imported}
+        io_ops = [IOOperation("json.load", rng.randint(1, 500), rng.randint(0, 40), "json")
+                  for _ in range(rng.randint(0, 3))]
+        lines = rng.randint(10, 2000)
+        yield path, {
+            "imports": imports,
+            "io_call_count": len(io_ops),
+            "function_usage": function_usage,
+            "io_operations": io_ops,
+            "file_info": {"path": f"/repo/{path}", "size": lines * 30, "lines": lines, "empty": False},
+        }
+
+def _legacy_add(dependencies, file_path, analysis_result):
+    """The nested-dict layout DependencyStore used to keep in memory, for comparison."""
+    dependencies["files"][file_path] = {
+        "imports": list(analysis_result["imports"].keys()),
+        "io_count": analysis_result["io_call_count"],
+        "function_usage": {m: sorted(f) for m, f in analysis_result["function_usage"].items()},
+    }
+    dependencies["io_operations"][file_path] = [format_io_operation(op) for op in analysis_result["io_operations"]]
+    dependencies["file_info"][file_path] = analysis_result["file_info"]
+    for module in analysis_result["imports"]:
+        dependencies["modules"].setdefault(module, [])
+        if file_path not in dependencies["modules"][module]:
+            dependencies["modules"][module].append(file_path)
+
+def _traced(build):
+    """Bytes still allocated by build()'s result once it returns."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+def bench_memory(num_files):
+    """Compare retained memory of the legacy nested-dict layout and DependencyStore."""
+    def build_legacy():
+        dependencies = {"files": {}, "modules": {}, "io_operations": {}, "file_info": {}}
+        for file_path, result in synthetic_results(num_files):
+            _legacy_add(dependencies, file_path, result)
+        return dependencies
+
+    def build_store():
+        store = DependencyStore(output_dir=tempfile.mkdtemp())
+        for file_path, result in synthetic_results(num_files):
+            store.add_file_dependencies(file_path, result)
+        return store
+
+    legacy = _traced(build_legacy)
+    store = _traced(build_store)
+    print(f"{num_files} files")
+    print(f"  nested dicts:    {legacy / 2**20:8.1f} MiB")
+    print(f"  DependencyStore: {store / 2**20:8.1f} MiB  ({100 * (1 - store / legacy):.0f}% less)")
+
+def _timed(build, results):
+    """Seconds build(results) takes."""
+    gc.collect()
+    start = time.perf_counter()
+    build(results)
+    return time.perf_counter() - start
+
+def bench_build(file_counts, legacy_limit=20000):
+    """Time building the store from pre-generated results; per-file cost should stay flat."""
+    def build_legacy(results):
+        dependencies = {"files": {}, "modules": {}, "io_operations": {}, "file_info": {}}
+        for file_path, result in results:
+            _legacy_add(dependencies, file_path, result)
+
+    def build_store(results):
+        store = DependencyStore(output_dir=tempfile.mkdtemp())
+        for file_path, result in results:
+            store.add_file_dependencies(file_path, result)
+
+    print(f"{'files':>8} {'list index':>14} {'DependencyStore':>17}")
+    for num_files in file_counts:
+        results = list(synthetic_results(num_files))
+        # the list-backed index is quadratic; skip it where it would take minutes
+        legacy = f"{_timed(build_legacy, results):13.2f}s" if num_files <= legacy_limit else f"{'-':>14}"
+        store = _timed(build_store, results)
+        print(f"{num_files:>8} {legacy} {store:16.2f}s  ({1e6 * store / num_files:.1f} us/file)")
+
+def _peak(fn):
+    """Peak bytes allocated while fn() runs."""
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+def bench_save(file_counts):
+    """Peak memory of saving the store in one json.dump versus the streaming save()."""
+    print(f"{'files':>8} {'json.dump':>12} {'save()':>10} {'save(compact)':>14}")
+    for num_files in file_counts:
+        store = DependencyStore(output_dir=tempfile.mkdtemp())
+        for file_path, result in synthetic_results(num_files):
+            store.add_file_dependencies(file_path, result)
+
+        def dump_whole():
+            with open(os.path.join(store.output_dir, "whole.json"), "w", encoding="utf-8") as f:
+                json.dump(store.get_all_dependencies(), f, indent=2)
+
+        whole = _peak(dump_whole)
+        streamed = _peak(lambda: store.save("streamed.json"))
+        compact = _peak(lambda: store.save("compact.json", compact=True))
+        print(f"{num_files:>8} {whole / 2**20:9.1f} MiB {streamed / 2**20:6.1f} MiB {compact / 2**20:10.1f} MiB")
+
+def _seconds(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+def bench_snapshot(num_files):
+    """Save time, load time and file size of JSON versus the binary snapshot."""
+    store = DependencyStore(output_dir=tempfile.mkdtemp())
+    for file_path, result in synthetic_results(num_files):
+        store.add_file_dependencies(file_path, result)
+    formats = [
+        ("JSON", "deps.json", lambda: store.save("deps.json"),
+         lambda: DependencyStore(store.output_dir).load("deps.json")),
+        ("JSON (compact)", "compact.json", lambda: store.save("compact.json", compact=True),
+         lambda: DependencyStore(store.output_dir).load("compact.json")),
+        ("snapshot", "deps.snap", lambda: store.save_snapshot("deps.snap"),
+         lambda: DependencyStore(store.output_dir).load_snapshot("deps.snap")),
+    ]
+    print(f"{num_files} files")
+    print(f"  {'format':<16} {'save':>8} {'load':>8} {'size':>10}")
+    for name, filename, save, load in formats:
+        gc.collect()
+        save_time = _seconds(save)
+        gc.collect()
+        load_time = _seconds(load)
+        size = os.path.getsize(store.output_dir / filename)
+        print(f"  {name:<16} {save_time:7.2f}s {load_time:7.2f}s {size / 2**20:6.1f} MiB")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+    memory = subparsers.add_parser("memory", help="Memory held by the store")
+    memory.add_argument("--files", type=int, default=20000)
+    build = subparsers.add_parser("build", help="Time to build the store as the file count grows")
+    build.add_argument("--files", type=int, nargs="+", default=[5000, 10000, 20000, 40000])
+    save = subparsers.add_parser("save", help="Peak memory while saving the store")
+    save.add_argument("--files", type=int, nargs="+", default=[5000, 20000, 80000])
+    snapshot = subparsers.add_parser("snapshot", help="JSON versus binary snapshot save/load time and size")
+    snapshot.add_argument("--files", type=int, default=50000)
+    args = parser.parse_args()
+    if args.benchmark == "memory":
+        bench_memory(args.files)
+    elif args.benchmark == "build":
+        bench_build(args.files)
+    elif args.benchmark == "save":
+        bench_save(args.files)
+    elif args.benchmark == "snapshot":
+        bench_snapshot(args.files)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Command-line tools for saved dependency stores:
+
+    python cli.py merge merged.json part1.json part2.json.gz part3.snap
+    git diff --name-only main | python cli.py impact dependencies.snap --from-file - --match "*test_*.py"
+"""
+import argparse
+import os
+import sys
+from fnmatch import fnmatch
+from pathlib import Path
+from dependency_store import DependencyStore
+from impact import ImpactIndex, read_impact_index, store_file_path, write_impact_index
+
+SNAPSHOT_SUFFIX = ".snap"
+
+def open_store(path):
+    """Load a store saved as JSON (optionally compressed) or as a snapshot."""
+    path = Path(path)
+    store = DependencyStore(output_dir=str(path.parent))
+    loaded = store.load_snapshot(path.name) if path.suffix == SNAPSHOT_SUFFIX else store.load(path.name)
+    if not loaded:
+        raise FileNotFoundError(f"No saved dependencies at {path}")
+    return store
+
+def save_store(store, path, compact=False):
+    """Save a store as JSON (compressed by a .gz/.bz2/.xz suffix) or as a snapshot."""
+    path = Path(path)
+    store.output_dir = path.parent
+    os.makedirs(path.parent, exist_ok=True)
+    if path.suffix == SNAPSHOT_SUFFIX:
+        return store.save_snapshot(path.name)
+    return store.save(path.name, compact=compact)
+
+def merge(args):
+    merged = DependencyStore(output_dir=str(Path(args.output).parent))
+    for input_path in args.inputs:
+        counts = merged.merge(open_store(input_path), on_conflict=args.on_conflict)
+        print(f"{input_path}: {counts['added']} added, {counts['replaced']} replaced, {counts['kept']} kept")
+    output_path = save_store(merged, args.output, compact=args.compact)
+    print(f"Merged {len(args.inputs)} stores ({merged.get_summary()['total_files']} files) into: {output_path}")
+
+def open_impact_index(path):
+    """The impact index of a saved store, from its sidecar if up to date, else built and saved."""
+    path = Path(path)
+    index = read_impact_index(path)
+    if index is None:
+        graph = open_store(path).dependency_graph()
+        try:
+            index = write_impact_index(path, graph)
+        except OSError:
+            index = ImpactIndex.from_graph(graph)  # read-only location: rebuild next time
+    return index
+
+def impact(args):
+    changed = list(args.changed)
+    if args.from_file:
+        with (sys.stdin if args.from_file == "-" else open(args.from_file, encoding="utf-8")) as f:
+            changed.extend(line.strip() for line in f if line.strip())
+    index = open_impact_index(args.store)
+    impacted = index.impacted((store_file_path(file_path, args.root) for file_path in changed),
+                              include_changed=args.include_changed)
+    for file_path in impacted:
+        if not args.match or any(fnmatch(file_path, pattern) for pattern in args.match):
+            print(file_path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    merge_parser = subparsers.add_parser("merge", help="Merge saved stores, e.g. from separate machines, into one")
+    merge_parser.add_argument("output", help="Merged store (.json, .json.gz/.bz2/.xz or .snap)")
+    merge_parser.add_argument("inputs", nargs="+", help="Stores to merge, in order")
+    merge_parser.add_argument("--on-conflict", choices=["replace", "keep", "error"], default="replace",
+                              help="For files in several stores: the later store wins (replace), the "
+                                   "earlier one wins (keep), or stop (error)")
+    merge_parser.add_argument("--compact", action="store_true", help="Write compact JSON")
+    impact_parser = subparsers.add_parser("impact", help="List the files that import changed files, directly or "
+                                                         "transitively, e.g. to pick the tests to run")
+    impact_parser.add_argument("store", help="Saved store (.json, .json.gz/.bz2/.xz or .snap); its impact index "
+                                             "is kept next to it as <store>.impact")
+    impact_parser.add_argument("changed", nargs="*", help="Changed files, relative to the codebase root")
+    impact_parser.add_argument("--from-file", metavar="FILE", help="Also read changed files from FILE, one per "
+                                                                   "line (- for stdin)")
+    impact_parser.add_argument("--root", help="Codebase root the changed paths are under, if they aren't "
+                                              "relative to it (e.g. absolute, or from a parent directory)")
+    impact_parser.add_argument("--include-changed", action="store_true", help="List the changed files too")
+    impact_parser.add_argument("--match", action="append", metavar="PATTERN",
+                               help="Only list files matching this glob, e.g. \"*test_*.py\" (repeatable)")
+    args = parser.parse_args(argv)
+    try:
+        if args.command == "merge":
+            merge(args)
+        elif args.command == "impact":
+            impact(args)
+    except (OSError, ValueError) as e:
+        parser.exit(1, f"error: {e}\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+from itertools import compress
+from typing import Dict, Iterable, List, Optional, Tuple
+from module_resolver import ModuleResolver
+
+_BIT_SELECTORS = bytes.maketrans(b"01", b"\x00\x01")
+
+class DependencyGraph:
+    """
+    File-level import graph of a store, for transitive closure queries.
+
+    Each file's imports are resolved to analyzed files with ModuleResolver (imports of
+    other modules are left out); stores pass the resolver they keep across builds. Files
+    importing each other in a cycle form one strongly connected component (SCC) and
+    share one closure, so closures are computed per SCC of the condensed, acyclic graph,
+    each from its neighbours' closures, and memoized as integer bitsets over file
+    indexes (at most one bit per file each). Computing every file's closure therefore
+    costs one bitset OR per condensed edge rather than a traversal per file. The graph
+    is a snapshot: stores build a new one after they change.
+    """
+
+    def __init__(self, file_imports: Iterable[Tuple[str, Iterable[str]]], resolver: Optional[ModuleResolver] = None):
+        file_imports = list(file_imports)
+        self.files: List[str] = [file_path for file_path, _ in file_imports]
+        self.index: Dict[str, int] = {file_path: i for i, file_path in enumerate(self.files)}
+        resolve = (resolver if resolver is not None else ModuleResolver(self.files)).resolve
+        self.edges: List[List[int]] = []  # file index -> indexes of the files it imports
+        for file_path, imports in file_imports:
+            targets = {}
+            for module in imports:
+                target = resolve(module, file_path)
+                if target is not None:
+                    targets[self.index[target]] = None
+            self.edges.append(list(targets))
+        self._condense()
+        self._forward: Dict[int, int] = {}  # SCC -> bitset of the files it depends on
+        self._reverse: Dict[int, int] = {}  # SCC -> bitset of the files depending on it
+
+    def _condense(self):
+        """Find the SCCs (Tarjan's algorithm, iteratively) and the edges between them."""
+        edges = self.edges
+        n = len(edges)
+        order = [-1] * n  # DFS discovery order
+        low = [0] * n
+        on_stack = [False] * n
+        stack: List[int] = []
+        self.component: List[int] = [-1] * n  # file index -> SCC
+        self.members: List[List[int]] = []  # SCC -> indexes of its files
+        counter = 0
+        for root in range(n):
+            if order[root] != -1:
+                continue
+            work = [(root, 0)]
+            while work:
+                node, pos = work.pop()
+                if pos == 0:
+                    order[node] = low[node] = counter
+                    counter += 1
+                    stack.append(node)
+                    on_stack[node] = True
+                targets = edges[node]
+                while pos < len(targets):
+                    target = targets[pos]
+                    pos += 1
+                    if order[target] == -1:
+                        work.append((node, pos))
+                        work.append((target, 0))
+                        break
+                    if on_stack[target] and order[target] < low[node]:
+                        low[node] = order[target]
+                else:
+                    if low[node] == order[node]:
+                        # Tarjan emits SCCs sinks first, so successors always get lower numbers
+                        members = []
+                        while True:
+                            member = stack.pop()
+                            on_stack[member] = False
+                            self.component[member] = len(self.members)
+                            members.append(member)
+                            if member == node:
+                                break
+                        self.members.append(members)
+                    if work:
+                        parent = work[-1][0]
+                        if low[node] < low[parent]:
+                            low[parent] = low[node]
+        component = self.component
+        self.successors: List[List[int]] = [[] for _ in self.members]
+        self.predecessors: List[List[int]] = [[] for _ in self.members]
+        seen = set()
+        for node, targets in enumerate(edges):
+            source = component[node]
+            for target in targets:
+                target = component[target]
+                if target != source and (source, target) not in seen:
+                    seen.add((source, target))
+                    self.successors[source].append(target)
+                    self.predecessors[target].append(source)
+
+    def _closure(self, component: int, neighbours: List[List[int]], memo: Dict[int, int]) -> int:
+        """Bitset of the files reachable from an SCC (its own files included), memoized."""
+        if component in memo:
+            return memo[component]
+        work = [component]
+        while work:
+            current = work[-1]
+            pending = [other for other in neighbours[current] if other not in memo]
+            if pending:
+                work.extend(pending)
+                continue
+            work.pop()
+            if current not in memo:
+                bits = 0
+                for member in self.members[current]:
+                    bits |= 1 << member
+                for other in neighbours[current]:
+                    bits |= memo[other]
+                memo[current] = bits
+        return memo[component]
+
+    def _files(self, bits: int) -> List[str]:
+        """The files in a bitset, in store order."""
+        # bin() lists bits highest first; reversed and mapped to 0/1 bytes, it selects the files
+        return list(compress(self.files, bin(bits)[:1:-1].encode("ascii").translate(_BIT_SELECTORS)))
+
+    def _query(self, file_paths: Iterable[str], neighbours: List[List[int]], memo: Dict[int, int]) -> List[str]:
+        bits = own = 0
+        for file_path in file_paths:
+            i = self.index.get(file_path)
+            if i is not None:
+                bits |= self._closure(self.component[i], neighbours, memo)
+                own |= 1 << i
+        return self._files(bits & ~own)
+
+    def dependencies(self, file_path: str) -> List[str]:
+        """Every analyzed file file_path imports, directly or transitively."""
+        return self._query((file_path,), self.successors, self._forward)
+
+    def dependents(self, file_path: str) -> List[str]:
+        """Every analyzed file importing file_path, directly or transitively."""
+        return self._query((file_path,), self.predecessors, self._reverse)
+
+    def dependents_of(self, file_paths: Iterable[str]) -> List[str]:
+        """Every analyzed file importing any of file_paths, directly or transitively, except file_paths themselves."""
+        return self._query(file_paths, self.predecessors, self._reverse)
+
+class GraphQueries:
+    """
+    Transitive import queries for a store class, built on its get_all_files(),
+    iter_file_imports() and get_module_dependents(). The store keeps the resolver and
+    graph in _resolver and _graph, setting them back to None when its files change.
+    """
+    _resolver: Optional[ModuleResolver] = None
+    _graph: Optional[DependencyGraph] = None
+
+    def module_resolver(self) -> ModuleResolver:
+        """The module-resolution index of the analyzed files, built on first use after files come or go."""
+        if self._resolver is None:
+            self._resolver = ModuleResolver(self.get_all_files())
+        return self._resolver
+
+    def dependency_graph(self) -> DependencyGraph:
+        """The file-level import graph, built on first use after any change."""
+        if self._graph is None:
+            self._graph = DependencyGraph(self.iter_file_imports(), self.module_resolver())
+        return self._graph
+
+    def get_transitive_dependencies(self, file_path: str) -> List[str]:
+        """Get every analyzed file that file_path imports, directly or transitively."""
+        return self.dependency_graph().dependencies(file_path)
+
+    def get_transitive_dependents(self, file_path: str) -> List[str]:
+        """Get every analyzed file that imports file_path, directly or transitively."""
+        return self.dependency_graph().dependents(file_path)
+
+    def get_files_affected_by_module(self, module: str) -> List[str]:
+        """Get every file importing a module (internal or not), directly or transitively."""
+        direct = self.get_module_dependents(module)
+        return direct + self.dependency_graph().dependents_of(direct)
+
+    def get_impacted_files(self, changed_files: Iterable[str], include_changed: bool = False) -> List[str]:
+        """
+        Get every file that imports any of changed_files, directly or transitively, e.g. to
+        pick the tests to run; with include_changed, the changed files themselves come first.
+        """
+        changed_files = list(dict.fromkeys(changed_files))
+        impacted = self.dependency_graph().dependents_of(changed_files)
+        return changed_files + impacted if include_changed else impacted
@@ -1,137 +1,435 @@
 import json
+from array import array
 from pathlib import Path
-from typing import Dict, Set, List, Any
-import os
+from typing import Dict, List, Any, Union, Optional, Iterator, Tuple
+from analyzer import IOOperation
+from dependency_graph import DependencyGraph, GraphQueries
+from file_analysis import FileAnalysis, SymbolTable
+from json_stream import COMPRESSORS, open_json, with_compression, write_index, write_sections
+from module_resolver import ModuleResolver
+from ranking import Ranking
+from snapshot import read_snapshot, write_snapshot
 
-class DependencyStore:
+class DependencyStore(GraphQueries):
     def __init__(self, output_dir: str = "output_files"):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
-        self.dependencies = {
-            "files": {},  # file -> dependencies
-            "modules": {},  # module -> files that import it
-            "io_operations": {},  # file -> list of I/O operations
-            "function_usage": {},  # file -> {module -> set of functions}
-            "file_info": {},  # file -> basic file information
-            "summary": {  # overall summary statistics
-                "total_files": 0,
-                "total_imports": 0,
-                "total_io_operations": 0,
-                "total_lines": 0,
-                "empty_files": 0
-            }
+        # Internal representation: one compact FileAnalysis record per file, with module and
+        # symbol names replaced by SymbolTable IDs; the JSON layout ("files", "io_operations",
+        # "file_info", ...) and the names are only built on export
+        self.symbols = SymbolTable()
+        self.records: Dict[str, FileAnalysis] = {}  # file -> analysis record
+        # Reverse indexes use dicts with None values as insertion-ordered sets, so adding or
+        # removing a file is O(1) per entry while exported file lists keep their order
+        self.modules: Dict[int, Dict[str, None]] = {}  # module ID -> files that import it
+        # I/O operation / category ID -> files using it
+        self.io_by_operation: Dict[int, Dict[str, None]] = {}
+        self.io_by_category: Dict[int, Dict[str, None]] = {}
+        self.files_with_io: Dict[str, None] = {}  # files with at least one I/O operation
+        # (module ID, symbol ID) -> files using that symbol of the module; as large as all
+        # the function usage together, so only built by the first query needing it
+        self.usage_by_symbol: Optional[Dict[Tuple[int, int], Dict[str, None]]] = None
+        # (index name, key) of the secondary index entries a replaced file was re-added at
+        # the end of; each is put back in store order by the next query reading it
+        self._unordered: Dict[Tuple[str, Any], None] = {}
+        # Top-N rankings kept up to date as files come and go (ties in insertion order)
+        self.io_ranking = Ranking()  # file -> io_count, for every file
+        self.size_ranking = Ranking()  # file -> lines, for files with file_info
+        self.module_ranking = Ranking()  # module ID -> number of dependents
+        # Modules whose dependents changed since module_ranking was last brought up to date;
+        # batched because popular modules change with nearly every file
+        self._modules_touched: Dict[int, None] = {}
+        self.summary = {  # overall summary statistics
+            "total_files": 0,
+            "total_imports": 0,
+            "total_io_operations": 0,
+            "total_lines": 0,
+            "empty_files": 0
         }
+        self._snapshot = None  # memory map backing records opened with load_snapshot()
+        self._graph: Optional[DependencyGraph] = None  # built on demand, dropped on any change
+        self._resolver: Optional[ModuleResolver] = None  # built on demand, dropped when files come or go
+    
+    @property
+    def dependencies(self) -> Dict[str, Any]:
+        """The store in its JSON layout (built on every access)."""
+        return self.get_all_dependencies()
     
-    def add_file_dependencies(self, file_path: str, analysis_result: Dict[str, Any]):
-        """Add dependencies for a single file to the store."""
+    def add_file_dependencies(self, file_path: str, analysis_result: Union[Dict[str, Any], FileAnalysis]):
+        """Add dependencies for a single file to the store, replacing any previous entry."""
         # file_path is already normalized and relative
-        self.dependencies["files"][file_path] = {
-            "imports": list(analysis_result["imports"].keys()),
-            "io_count": analysis_result["io_call_count"],
-            "function_usage": {
-                module: list(functions) 
-                for module, functions in analysis_result["function_usage"].items()
-            }
-        }
-        
-        # Store I/O operations
-        if "io_operations" in analysis_result:
-            self.dependencies["io_operations"][file_path] = analysis_result["io_operations"]
+        seq = None
+        if file_path in self.records:
+            # A replaced file keeps its place in the records dict, and so among equal ranks
+            seq = self.io_ranking.seq(file_path)
+            self._discard_file_contribution(file_path)
+        else:
+            self._resolver = None
+        if not isinstance(analysis_result, FileAnalysis):
+            analysis_result = FileAnalysis.from_analysis(analysis_result, self.symbols)
+        self.records[file_path] = analysis_result
+        self._add_file_contribution(file_path, analysis_result, seq)
+        if seq is not None:
+            self._mark_unordered(analysis_result)
+    
+    def _add_file_contribution(self, file_path: str, record: FileAnalysis, seq: Optional[int] = None):
+        """Link a file into the reverse index and rankings and count it in the summary."""
+        self._graph = None
+        # Update module dependencies
+        touched = self._modules_touched
+        for module in record.imports:
+            self.modules.setdefault(module, {})[file_path] = None
+            touched[module] = None
         
-        # Store file information
-        if "file_info" in analysis_result:
-            self.dependencies["file_info"][file_path] = analysis_result["file_info"]
+        seq = self.io_ranking.set(file_path, record.io_count, seq)
+        if record.has_file_info:
+            self.size_ranking.set(file_path, record.lines, seq)
         
-        # Update module dependencies
-        for module in analysis_result["imports"]:
-            if module not in self.dependencies["modules"]:
-                self.dependencies["modules"][module] = []
-            if file_path not in self.dependencies["modules"][module]:
-                self.dependencies["modules"][module].append(file_path)
+        self._index_file(file_path, record)
         
         # Update summary statistics
-        self._update_summary(file_path, analysis_result)
-    
-    def _update_summary(self, file_path: str, analysis_result: Dict[str, Any]):
-        """Update summary statistics."""
-        summary = self.dependencies["summary"]
-        summary["total_files"] += 1
-        summary["total_imports"] += len(analysis_result["imports"])
-        summary["total_io_operations"] += analysis_result["io_call_count"]
+        self._update_summary(record, 1)
+    
+    def remove_file_dependencies(self, file_path: str) -> bool:
+        """Remove a single file's entries, reverse-index links and summary counts."""
+        if file_path not in self.records:
+            return False
+        self._discard_file_contribution(file_path)
+        del self.records[file_path]
+        self._resolver = None
+        return True
+    
+    def update_files(self, updated: Dict[str, Dict[str, Any]], deleted=()) -> Dict[str, int]:
+        """
+        Incrementally apply changes to the store.
+
+        Args:
+            updated: file path -> fresh analysis result, for changed and added files
+            deleted: file paths that no longer exist
+
+        Returns:
+            Counts of files that were added, replaced and removed
+        """
+        counts = {"added": 0, "replaced": 0, "removed": 0}
+        for file_path in deleted:
+            if self.remove_file_dependencies(file_path):
+                counts["removed"] += 1
+        for file_path, analysis_result in updated.items():
+            counts["replaced" if file_path in self.records else "added"] += 1
+            self.add_file_dependencies(file_path, analysis_result)
+        return counts
+    
+    def merge(self, other: "DependencyStore", on_conflict: str = "replace") -> Dict[str, int]:
+        """
+        Merge another store's files into this one, e.g. partial stores from parallel or
+        distributed runs. The modules reverse index, I/O indexes and summary are updated
+        as if the files had been added here, in the other store's order.
+
+        Args:
+            other: Store to merge in (left unchanged; a lazily opened one is loaded fully first)
+            on_conflict: For files in both stores: "replace" (the other store's entry wins,
+                so merging stores in order keeps the last one), "keep" (this store's wins)
+                or "error" (raise ValueError)
+
+        Returns:
+            Counts of files that were added, replaced and kept
+        """
+        if on_conflict not in ("replace", "keep", "error"):
+            raise ValueError(f"Unknown on_conflict {on_conflict!r}, expected 'replace', 'keep' or 'error'")
+        if hasattr(other, "load_all"):
+            other.load_all()  # records and symbols are only complete once a lazy store is loaded
+        if on_conflict == "error":
+            conflicts = [file_path for file_path in other.records if file_path in self.records]
+            if conflicts:
+                raise ValueError(f"{len(conflicts)} files are in both stores, e.g. {conflicts[0]}")
+        # Translate the other store's symbol IDs into this store's once, not per file
+        id_map = array("I", (self.symbols.intern(name) for name in other.symbols.names))
+        counts = {"added": 0, "replaced": 0, "kept": 0}
+        for file_path, record in other.records.items():
+            if file_path in self.records:
+                if on_conflict == "keep":
+                    counts["kept"] += 1
+                    continue
+                counts["replaced"] += 1
+            else:
+                counts["added"] += 1
+            self.add_file_dependencies(file_path, record.remapped(id_map))
+        return counts
+    
+    def _discard_file_contribution(self, file_path: str):
+        """Undo what add_file_dependencies contributed to the reverse index, rankings and summary."""
+        self._graph = None
+        record = self.records[file_path]
+        for module in record.imports:
+            dependents = self.modules.get(module)
+            if dependents is None:
+                continue
+            dependents.pop(file_path, None)
+            if not dependents:
+                del self.modules[module]
+                self.module_ranking.discard(module)
+                self._modules_touched.pop(module, None)
+            else:
+                self._modules_touched[module] = None
+        self.io_ranking.discard(file_path)
+        self.size_ranking.discard(file_path)
         
-        if "file_info" in analysis_result:
-            file_info = analysis_result["file_info"]
-            summary["total_lines"] += file_info.get("lines", 0)
-            if file_info.get("empty", False):
-                summary["empty_files"] += 1
-    
-    def save(self, filename: str = "dependencies.json"):
-        """Save dependencies to a JSON file."""
-        output_path = self.output_dir / filename
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(self.dependencies, f, indent=2)
+        self.files_with_io.pop(file_path, None)
+        for op_id, _, _, category_id in record.iter_io_operation_ids():
+            self._unindex(self.io_by_operation, op_id, file_path)
+            self._unindex(self.io_by_category, category_id, file_path)
+        if self.usage_by_symbol is not None:
+            for module_id, symbol_ids in record.iter_function_usage():
+                for symbol_id in symbol_ids:
+                    self._unindex(self.usage_by_symbol, (module_id, symbol_id), file_path)
+        
+        self._update_summary(record, -1)
+    
+    def _index_file(self, file_path: str, record: FileAnalysis):
+        """Add a file to the secondary (I/O and symbol usage) indexes."""
+        if record.io_operations:
+            self.files_with_io[file_path] = None
+        for op_id, _, _, category_id in record.iter_io_operation_ids():
+            self.io_by_operation.setdefault(op_id, {})[file_path] = None
+            self.io_by_category.setdefault(category_id, {})[file_path] = None
+        if self.usage_by_symbol is not None:
+            self._index_usage(file_path, record)
+    
+    def _mark_unordered(self, record: FileAnalysis):
+        """Note the secondary index entries a replaced file's record was just re-added to."""
+        unordered = self._unordered
+        if record.io_operations:
+            unordered[("files_with_io", None)] = None
+        for op_id, _, _, category_id in record.iter_io_operation_ids():
+            unordered[("io_by_operation", op_id)] = None
+            unordered[("io_by_category", category_id)] = None
+        if self.usage_by_symbol is not None:
+            for module_id, symbol_ids in record.iter_function_usage():
+                for symbol_id in symbol_ids:
+                    unordered[("usage_by_symbol", (module_id, symbol_id))] = None
+    
+    def _in_store_order(self, files: Dict[str, None], entry: Tuple[str, Any]) -> Dict[str, None]:
+        """One secondary index entry's files, re-sorted by their ranking seq (store order) if marked unordered."""
+        if entry not in self._unordered:
+            return files
+        del self._unordered[entry]
+        entries = self.io_ranking.entries
+        # Only the replaced files are out of place, so the sort is close to linear
+        return dict.fromkeys(sorted(files, key=lambda file_path: entries[file_path][1]))
+    
+    def _ordered_files(self, index_name: str, key) -> List[str]:
+        """The files of a secondary index (by attribute name) entry, in store order."""
+        index = getattr(self, index_name)
+        files = index.get(key)
+        if files is None:
+            return []
+        files = index[key] = self._in_store_order(files, (index_name, key))
+        return list(files)
+    
+    def _index_usage(self, file_path: str, record: FileAnalysis):
+        usage_by_symbol = self.usage_by_symbol
+        for module_id, symbol_ids in record.iter_function_usage():
+            for symbol_id in symbol_ids:
+                usage_by_symbol.setdefault((module_id, symbol_id), {})[file_path] = None
+    
+    @staticmethod
+    def _unindex(index: Dict[Any, Dict[str, None]], key, file_path: str):
+        files = index.get(key)
+        if files is not None:
+            files.pop(file_path, None)
+            if not files:
+                del index[key]
+    
+    def _update_summary(self, record: FileAnalysis, sign: int):
+        """Update summary statistics (sign is 1 when adding a file, -1 when removing it)."""
+        summary = self.summary
+        summary["total_files"] += sign
+        summary["total_imports"] += sign * len(record.imports)
+        summary["total_io_operations"] += sign * record.io_count
+        
+        if record.has_file_info:
+            summary["total_lines"] += sign * record.lines
+            if record.empty:
+                summary["empty_files"] += sign
+    
+    def save(self, filename: str = "dependencies.json", compact: bool = False, compression: Optional[str] = None,
+             index: bool = False):
+        """
+        Save dependencies to a JSON file, streamed one file entry at a time.
+
+        Args:
+            filename: Output file name; a .gz/.bz2/.xz suffix compresses the output
+            compact: Write without indentation or spaces
+            compression: "gzip", "bz2" or "xz" to compress (the suffix is added to filename)
+            index: Also write the byte-offset index LazyDependencyStore opens the file with
+                (uncompressed output only)
+        """
+        output_path = with_compression(self.output_dir / filename, compression)
+        offsets = {} if index and output_path.suffix not in COMPRESSORS else None
+        with open_json(output_path, 'w') as f:
+            write_sections(f, self.iter_sections(), compact=compact, offsets=offsets)
+        if offsets is not None:
+            write_index(output_path, offsets)
         return output_path
     
     def load(self, filename: str = "dependencies.json"):
         """Load dependencies from a JSON file."""
         input_path = self.output_dir / filename
         if input_path.exists():
-            with open(input_path, 'r', encoding='utf-8') as f:
-                self.dependencies = json.load(f)
+            with open_json(input_path) as f:
+                data = json.load(f)
+            io_operations = data.get("io_operations", {})
+            file_info = data.get("file_info", {})
+            self.symbols = symbols = SymbolTable()
+            self.records = {
+                file_path: FileAnalysis.from_export(symbols, file_entry, io_operations.get(file_path),
+                                                    file_info.get(file_path))
+                for file_path, file_entry in data.get("files", {}).items()
+            }
+            self.modules = {symbols.intern(module): dict.fromkeys(files)
+                            for module, files in data.get("modules", {}).items()}
+            self._rebuild_indexes()
+            self.summary = data.get("summary", self.summary)
             return True
         return False
     
+    def _rebuild_indexes(self):
+        """Rebuild the secondary indexes and rankings from records and modules, after a load."""
+        self._graph = None
+        self._resolver = None
+        self.io_by_operation = {}
+        self.io_by_category = {}
+        self.files_with_io = {}
+        self.usage_by_symbol = None
+        self._unordered = {}
+        self.io_ranking = Ranking()
+        self.size_ranking = Ranking()
+        self.module_ranking = Ranking()
+        self._modules_touched = {}
+        for module_id, files in self.modules.items():
+            self.module_ranking.set(module_id, len(files))
+        for file_path, record in self.records.items():
+            seq = self.io_ranking.set(file_path, record.io_count)
+            if record.has_file_info:
+                self.size_ranking.set(file_path, record.lines, seq)
+            self._index_file(file_path, record)
+    
+    def save_snapshot(self, filename: str = "dependencies.snap"):
+        """Save the store as a binary columnar snapshot (see snapshot.py), much faster to write and open than JSON."""
+        output_path = self.output_dir / filename
+        write_snapshot(output_path, self.symbols, self.records, self.modules, self.summary)
+        return output_path
+    
+    def load_snapshot(self, filename: str = "dependencies.snap"):
+        """Open a snapshot written by save_snapshot(); the records' ID arrays are read straight from the mapped file."""
+        input_path = self.output_dir / filename
+        if not input_path.exists():
+            return False
+        self.symbols, self.records, self.modules, self.summary, self._snapshot = read_snapshot(input_path)
+        self._rebuild_indexes()
+        return True
+    
     def get_file_dependencies(self, file_path: str) -> Dict[str, Any]:
         """Get dependencies for a specific file."""
         # file_path is already normalized and relative
-        return self.dependencies["files"].get(file_path, {})
+        record = self.records.get(file_path)
+        return record.to_file_entry(self.symbols) if record is not None else {}
+    
+    def get_file_io_operations(self, file_path: str) -> List[IOOperation]:
+        """Get I/O operations for a specific file, as IOOperation records."""
+        record = self.records.get(file_path)
+        return record.get_io_operations(self.symbols) if record is not None else []
+    
+    def get_files_by_io_operation(self, operation: str) -> List[str]:
+        """Get all files that perform a given I/O operation (e.g. "json.load", "open()")."""
+        op_id = self.symbols.lookup(operation)
+        return self._ordered_files("io_by_operation", op_id) if op_id is not None else []
+    
+    def get_files_by_io_category(self, category: str) -> List[str]:
+        """Get all files with I/O operations of a given category (e.g. "json", "database")."""
+        category_id = self.symbols.lookup(category)
+        return self._ordered_files("io_by_category", category_id) if category_id is not None else []
+    
+    def get_files_using_function(self, module: str, function: str) -> List[str]:
+        """Get all files that use a given function or class of a module (e.g. "os.path", "join")."""
+        module_id, symbol_id = self.symbols.lookup(module), self.symbols.lookup(function)
+        if module_id is None or symbol_id is None:
+            return []
+        if self.usage_by_symbol is None:
+            self.usage_by_symbol = {}
+            for file_path, record in self.records.items():
+                self._index_usage(file_path, record)
+        return self._ordered_files("usage_by_symbol", (module_id, symbol_id))
     
-    def get_file_io_operations(self, file_path: str) -> List[str]:
-        """Get I/O operations for a specific file."""
-        return self.dependencies["io_operations"].get(file_path, [])
+    def get_io_categories(self) -> Dict[str, int]:
+        """Get each I/O category in use and the number of files using it."""
+        names = self.symbols.names
+        return {names[category_id]: len(files) for category_id, files in self.io_by_category.items()}
     
     def get_file_info(self, file_path: str) -> Dict[str, Any]:
         """Get file information for a specific file."""
-        return self.dependencies["file_info"].get(file_path, {})
+        record = self.records.get(file_path)
+        return (record.to_file_info() or {}) if record is not None else {}
     
     def get_module_dependents(self, module: str) -> List[str]:
         """Get all files that depend on a specific module."""
-        return self.dependencies["modules"].get(module, [])
+        module_id = self.symbols.lookup(module)
+        return list(self.modules.get(module_id, ())) if module_id is not None else []
+    
+    def iter_file_imports(self) -> Iterator[Tuple[str, List[str]]]:
+        """Yield (file, imported module names) for every file."""
+        names = self.symbols.names
+        for file_path, record in self.records.items():
+            yield file_path, [names[module_id] for module_id in record.imports]
     
     def get_all_dependencies(self) -> Dict[str, Any]:
-        """Get all stored dependencies."""
-        return self.dependencies
+        """Get all stored dependencies, as plain dicts in the JSON layout."""
+        return {name: dict(pairs) for name, pairs in self.iter_sections()}
+    
+    def iter_sections(self) -> Iterator[Tuple[str, Iterator[Tuple[str, Any]]]]:
+        """Yield the JSON layout's sections as (name, lazy (key, value) pairs)."""
+        records = self.records
+        symbols = self.symbols
+        names = symbols.names
+        # file -> dependencies
+        yield "files", ((file_path, record.to_file_entry(symbols)) for file_path, record in records.items())
+        # module -> files that import it
+        yield "modules", ((names[module_id], list(files)) for module_id, files in self.modules.items())
+        # file -> list of {"operation", "line", "col", "category"}
+        yield "io_operations", ((file_path, [op._asdict() for op in record.get_io_operations(symbols)])
+                                for file_path, record in records.items() if record.io_operations is not None)
+        yield "function_usage", iter(())  # file -> {module -> set of functions}
+        # file -> basic file information
+        yield "file_info", ((file_path, record.to_file_info())
+                            for file_path, record in records.items() if record.has_file_info)
+        yield "summary", iter(dict(self.summary).items())  # overall summary statistics
     
     def get_summary(self) -> Dict[str, Any]:
         """Get summary statistics."""
-        return self.dependencies["summary"]
+        return self.summary
     
     def get_all_files(self) -> List[str]:
         """Get all file paths that have been analyzed."""
-        return list(self.dependencies["files"].keys())
+        return list(self.records.keys())
     
     def get_files_with_io(self) -> List[str]:
         """Get all files that have I/O operations."""
-        return [file_path for file_path, operations in self.dependencies["io_operations"].items() 
-                if operations]
-    
-    def get_largest_files(self, limit: int = 10) -> List[tuple]:
-        """Get the largest files by line count."""
-        file_sizes = []
-        for file_path, file_info in self.dependencies["file_info"].items():
-            file_sizes.append((file_path, file_info.get("lines", 0)))
-        return sorted(file_sizes, key=lambda x: x[1], reverse=True)[:limit]
-    
-    def get_most_imported_modules(self, limit: int = 10) -> List[tuple]:
-        """Get the most imported modules."""
-        module_counts = []
-        for module, files in self.dependencies["modules"].items():
-            module_counts.append((module, len(files)))
-        return sorted(module_counts, key=lambda x: x[1], reverse=True)[:limit]
-    
-    def get_files_by_io_count(self, limit: int = 10) -> List[tuple]:
-        """Get files with the most I/O operations."""
-        io_counts = []
-        for file_path, file_data in self.dependencies["files"].items():
-            io_counts.append((file_path, file_data.get("io_count", 0)))
-        return sorted(io_counts, key=lambda x: x[1], reverse=True)[:limit] 
\ No newline at end of file
+        self.files_with_io = self._in_store_order(self.files_with_io, ("files_with_io", None))
+        return list(self.files_with_io)
+    
+    def get_largest_files(self, limit: Optional[int] = 10, offset: int = 0) -> List[tuple]:
+        """Get the largest files by line count, ranked offset to offset + limit (limit None = all)."""
+        return self.size_ranking.top(limit, offset)
+    
+    def get_most_imported_modules(self, limit: Optional[int] = 10, offset: int = 0) -> List[tuple]:
+        """Get the most imported modules, ranked offset to offset + limit (limit None = all)."""
+        # Ranked on module IDs; only the returned modules are translated back to names
+        for module_id in self._modules_touched:
+            self.module_ranking.set(module_id, len(self.modules[module_id]))
+        self._modules_touched.clear()
+        names = self.symbols.names
+        return [(names[module_id], count) for module_id, count in self.module_ranking.top(limit, offset)]
+    
+    def get_files_by_io_count(self, limit: Optional[int] = 10, offset: int = 0) -> List[tuple]:
+        """Get files with the most I/O operations, ranked offset to offset + limit (limit None = all)."""
+        return self.io_ranking.top(limit, offset)
\ No newline at end of file
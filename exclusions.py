@@ -0,0 +1,217 @@
+import os
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Pattern, Tuple
+
+GITIGNORE = ".gitignore"
+DEFAULT_EXCLUDE_DIRS = ("venv", ".git", "__pycache__")
+
+class _Rule(NamedTuple):
+    base: str  # directory the pattern is relative to ("" = codebase root)
+    regex: Pattern  # matched against the path relative to base
+    literal: Optional[str]  # the name, for unanchored patterns without wildcards
+    negate: bool
+    dirs: bool  # applies to directories
+    files: bool  # applies to files
+
+def _translate(glob: str) -> str:
+    """Regex for a gitignore-style glob, matched against a whole "/"-separated path."""
+    parts = []
+    i, n = 0, len(glob)
+    while i < n:
+        c = glob[i]
+        if glob.startswith("**", i):
+            at_start = i == 0 or glob[i - 1] == "/"
+            if at_start and glob.startswith("**/", i):
+                parts.append("(?:.*/)?")  # zero or more leading directories
+                i += 3
+                continue
+            if at_start and i + 2 == n:
+                parts.append(".*")  # everything below
+                i += 2
+                continue
+            parts.append("[^/]*")  # not a whole segment: just a *
+            i += 2
+        elif c == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif c == "?":
+            parts.append("[^/]")
+            i += 1
+        elif c == "[":
+            start = i + 1
+            if glob[start:start + 1] in ("!", "^"):
+                start += 1
+            if glob[start:start + 1] == "]":
+                start += 1  # a leading ] is part of the set
+            end = glob.find("]", start)
+            if end == -1:
+                parts.append(re.escape(c))
+                i += 1
+                continue
+            body = glob[i + 1:end]
+            negated = body[:1] in ("!", "^")
+            if negated:
+                body = body[1:]
+            body = body.replace("\\", "\\\\").replace("[", "\\[").replace("]", "\\]")
+            parts.append(("[^" if negated else "[") + body + "]")
+            i = end + 1
+        elif c == "\\" and i + 1 < n:
+            parts.append(re.escape(glob[i + 1]))
+            i += 2
+        else:
+            parts.append(re.escape(c))
+            i += 1
+    return "".join(parts) + r"\Z"
+
+def compile_rule(pattern: str, base: str = "", dirs: bool = True, files: bool = True) -> Optional[_Rule]:
+    """
+    Compile one gitignore-style pattern, or return None for blank lines and comments.
+
+    Patterns without a "/" match a name at any depth; others are anchored at base. A
+    trailing "/" restricts a pattern to directories, a leading "!" re-includes what
+    earlier patterns excluded, and "*", "?", "[...]" and "**" work as in .gitignore.
+    """
+    pattern = pattern.rstrip("\n\r")
+    if not pattern.endswith("\\ "):
+        pattern = pattern.rstrip(" ")
+    if not pattern or pattern.startswith("#"):
+        return None
+    negate = pattern.startswith("!")
+    if negate:
+        pattern = pattern[1:]
+    elif pattern.startswith(("\\!", "\\#")):
+        pattern = pattern[1:]
+    if pattern.endswith("/"):
+        pattern = pattern.rstrip("/")
+        files = False
+    if not pattern:
+        return None
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+    regex = _translate(pattern) if anchored else "(?:.*/)?" + _translate(pattern)
+    literal = pattern if not anchored and not re.search(r"[*?\[\\]", pattern) else None
+    return _Rule(base, re.compile(regex, re.DOTALL), literal, negate, dirs, files)
+
+def read_gitignore(path: str, base: str) -> List[_Rule]:
+    """The rules of a .gitignore file, for paths below base (relative to the codebase root)."""
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return [rule for rule in (compile_rule(line, base) for line in f) if rule is not None]
+    except OSError:
+        return []
+
+class Exclusions:
+    """
+    Compiled exclusion rules, checked against paths relative to the codebase root.
+
+    Built from plain names (the old exclude_dirs/exclude_files lists keep their meaning),
+    glob patterns such as "build/", "*_pb2.py" or "pkg/generated/**", and optionally the
+    .gitignore files met during the walk. As in git, the last matching rule wins (later
+    .gitignore files being deeper in the tree) and the explicitly given rules come after
+    every .gitignore. Without any "!" rule, wildcard-free names are checked with one set
+    lookup and the remaining patterns with one combined regex per .gitignore location.
+    Instances are immutable; with_gitignore() returns an extended copy for a subtree.
+    """
+
+    def __init__(self, patterns: Iterable[str] = (), dir_patterns: Iterable[str] = (),
+                 file_patterns: Iterable[str] = (), gitignore: bool = False):
+        explicit = [compile_rule(p) for p in patterns]
+        explicit += [compile_rule(p, dirs=True, files=False) for p in dir_patterns]
+        explicit += [compile_rule(p, dirs=False, files=True) for p in file_patterns]
+        self.gitignore = gitignore
+        self._gitignore_rules: Tuple[_Rule, ...] = ()
+        self._explicit: Tuple[_Rule, ...] = tuple(rule for rule in explicit if rule is not None)
+        self._compile()
+
+    @classmethod
+    def from_names(cls, exclude_dirs: Optional[Iterable[str]] = None, exclude_files: Optional[Iterable[str]] = None,
+                   patterns: Iterable[str] = (), gitignore: bool = False) -> "Exclusions":
+        """
+        From the exclude_dirs/exclude_files lists used across the project (names or
+        patterns). Their names may be OS paths, as the GUI builds them with os.path.join,
+        so a backslash in them is a separator rather than a glob escape.
+        """
+        if exclude_dirs is None:
+            exclude_dirs = DEFAULT_EXCLUDE_DIRS
+        return cls(patterns, [name.replace("\\", "/") for name in exclude_dirs],
+                   [name.replace("\\", "/") for name in exclude_files or ()], gitignore)
+
+    def with_gitignore(self, directory: str, rel_dir: str) -> "Exclusions":
+        """
+        The rules for the subtree at directory (rel_dir relative to the codebase root):
+        self, plus its .gitignore if reading them is enabled and it has one.
+        """
+        if not self.gitignore:
+            return self
+        rules = read_gitignore(os.path.join(directory, GITIGNORE), rel_dir)
+        if not rules:
+            return self
+        extended = Exclusions.__new__(Exclusions)
+        extended.gitignore = True
+        extended._gitignore_rules = self._gitignore_rules + tuple(rules)
+        extended._explicit = self._explicit
+        extended._compile()
+        return extended
+
+    def excludes_file(self, root: str, rel_path: str) -> bool:
+        """
+        Whether the walk of the codebase at root would leave out a file (rel_path relative
+        to root, "/"-separated): the file itself or one of its directories is excluded,
+        with the .gitignore files on the way applied as the walk applies them.
+        """
+        exclusions = self.with_gitignore(root, "")
+        parts = rel_path.split("/")
+        for depth in range(1, len(parts)):
+            rel_dir = "/".join(parts[:depth])
+            if exclusions.excludes(rel_dir, True):
+                return True
+            exclusions = exclusions.with_gitignore(os.path.join(root, *parts[:depth]), rel_dir)
+        return exclusions.excludes(rel_path, False)
+
+    def _compile(self):
+        rules = self._gitignore_rules + self._explicit
+        self._rules = rules
+        self._ordered = any(rule.negate for rule in rules)
+        # base -> (names, combined regex) for directories, then the same for files
+        self._groups: Dict[str, Tuple[Tuple[frozenset, Optional[Pattern]], ...]] = {}
+        if self._ordered:
+            return
+        bases = list(dict.fromkeys(rule.base for rule in rules))
+        for base in bases:
+            group = []
+            for kind in ("dirs", "files"):
+                applicable = [rule for rule in rules if rule.base == base and getattr(rule, kind)]
+                names = frozenset(rule.literal for rule in applicable if rule.literal is not None)
+                regexes = [rule.regex.pattern for rule in applicable if rule.literal is None]
+                combined = re.compile("|".join(f"(?:{regex})" for regex in regexes), re.DOTALL) if regexes else None
+                group.append((names, combined))
+            self._groups[base] = tuple(group)
+
+    def excludes(self, rel_path: str, is_dir: bool) -> bool:
+        """Whether a path relative to the codebase root ("/"-separated) is excluded."""
+        name = rel_path.rpartition("/")[2]
+        if not self._ordered:
+            kind = 0 if is_dir else 1
+            for base, group in self._groups.items():
+                if base:
+                    if not rel_path.startswith(base + "/"):
+                        continue
+                    sub_path = rel_path[len(base) + 1:]
+                else:
+                    sub_path = rel_path
+                names, combined = group[kind]
+                if name in names or (combined is not None and combined.match(sub_path)):
+                    return True
+            return False
+        for rule in reversed(self._rules):
+            if not (rule.dirs if is_dir else rule.files):
+                continue
+            if rule.base:
+                if not rel_path.startswith(rule.base + "/"):
+                    continue
+                sub_path = rel_path[len(rule.base) + 1:]
+            else:
+                sub_path = rel_path
+            if (rule.literal == name) if rule.literal is not None else rule.regex.match(sub_path):
+                return not rule.negate
+        return False
@@ -0,0 +1,202 @@
+import re
+from array import array
+from typing import Dict, Any, List, Optional, Tuple, Iterator, Union
+from analyzer import IOOperation, io_operation_category
+from io_registry import DEFAULT_CATEGORY
+
+# Legacy dependencies JSON stored I/O operations as "json.load at line 12" strings
+_LEGACY_IO_OPERATION = re.compile(r"^(.*) at line (\d+)$")
+
+def parse_io_operation(op: Union[IOOperation, Dict[str, Any], List[Any], str]) -> IOOperation:
+    """Coerce a saved I/O operation (dict, list or legacy string) to an IOOperation."""
+    if isinstance(op, IOOperation):
+        return op
+    if isinstance(op, dict):
+        return IOOperation(op["operation"], op.get("line", 0), op.get("col", 0),
+                           op.get("category", DEFAULT_CATEGORY))
+    if isinstance(op, (list, tuple)):
+        return IOOperation(*op)
+    match = _LEGACY_IO_OPERATION.match(op)
+    operation, line = (match.group(1), int(match.group(2))) if match else (op, 0)
+    return IOOperation(operation, line, 0, io_operation_category(operation))
+
+class SymbolTable:
+    """
+    Store-wide table mapping module and symbol names to small integer IDs.
+
+    Each distinct name is kept once; per-file data refers to names by ID, and names are
+    only looked up again at the store's API boundary. IDs are never reused or removed.
+    """
+    __slots__ = ("names", "ids")
+
+    def __init__(self):
+        self.names: List[str] = []  # id -> name
+        self.ids: Dict[str, int] = {}  # name -> id
+
+    def intern(self, name: str) -> int:
+        """ID of name, adding it to the table if needed."""
+        symbol_id = self.ids.get(name)
+        if symbol_id is None:
+            symbol_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return symbol_id
+
+    def lookup(self, name: str) -> Optional[int]:
+        """ID of name, or None if no file ever mentioned it."""
+        return self.ids.get(name)
+
+    def name(self, symbol_id: int) -> str:
+        return self.names[symbol_id]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+class FileAnalysis:
+    """
+    Compact record of one file's analysis, as kept inside DependencyStore.
+
+    Uses __slots__ and integer ID arrays (see SymbolTable) instead of the nested
+    dicts/sets/lists of analyze_file()'s result; I/O operation and category names are
+    interned in the same table. Converted back to plain dicts with names only for export.
+    The ID arrays are array("I") objects, or read-only memoryviews into a snapshot opened
+    with DependencyStore.load_snapshot(); records are replaced, never modified in place.
+    """
+    __slots__ = ("imports", "io_count", "function_usage", "io_operations",
+                 "path", "size", "lines", "empty", "info_extra")
+
+    def __init__(self, imports: array, io_count: int, function_usage: array,
+                 io_operations: Optional[array] = None,
+                 path: Optional[str] = None, size: Optional[int] = None, lines: int = 0,
+                 empty: bool = False, info_extra: Optional[Tuple[Tuple[str, Any], ...]] = None):
+        self.imports = imports  # IDs of the imported modules, in import order
+        self.io_count = io_count
+        # Runs of [module ID, n, n symbol IDs sorted by name] for each module, in import order
+        self.function_usage = function_usage
+        # Runs of [operation ID, line, col, category ID]; None when the analysis had no I/O details
+        self.io_operations = io_operations
+        self.path = path  # file_info fields; size is None when the analysis had no file_info
+        self.size = size
+        self.lines = lines
+        self.empty = empty
+        self.info_extra = info_extra  # any other file_info items, e.g. ("imports_only", True)
+
+    @classmethod
+    def from_analysis(cls, analysis_result: Dict[str, Any], symbols: SymbolTable) -> "FileAnalysis":
+        """Build a record from an analyze_file() result."""
+        return cls._build(
+            symbols,
+            analysis_result["imports"],
+            analysis_result["io_call_count"],
+            analysis_result["function_usage"],
+            analysis_result.get("io_operations"),
+            analysis_result.get("file_info"),
+        )
+
+    @classmethod
+    def from_export(cls, symbols: SymbolTable, file_entry: Dict[str, Any],
+                    io_operations: Optional[List[Any]] = None,
+                    file_info: Optional[Dict[str, Any]] = None) -> "FileAnalysis":
+        """Build a record from the per-file sections of a saved dependencies JSON."""
+        return cls._build(
+            symbols,
+            file_entry.get("imports", []),
+            file_entry.get("io_count", 0),
+            file_entry.get("function_usage", {}),
+            io_operations,
+            file_info,
+        )
+
+    @classmethod
+    def _build(cls, symbols, imports, io_count, function_usage, io_operations, file_info) -> "FileAnalysis":
+        intern = symbols.intern
+        usage = array("I")
+        for module, functions in function_usage.items():
+            # sorted so the output doesn't depend on set order (which varies between
+            # processes), keeping parallel and serial runs byte-identical
+            functions = sorted(functions)
+            usage.append(intern(module))
+            usage.append(len(functions))
+            usage.extend(intern(name) for name in functions)
+        record = cls(
+            array("I", (intern(module) for module in imports)),
+            io_count,
+            usage,
+            cls._pack_io_operations(io_operations, intern) if io_operations is not None else None,
+        )
+        if file_info is not None:
+            record.path = file_info.get("path")
+            record.size = file_info.get("size", 0)
+            record.lines = file_info.get("lines", 0)
+            record.empty = file_info.get("empty", False)
+            extra = tuple((k, v) for k, v in file_info.items() if k not in ("path", "size", "lines", "empty"))
+            record.info_extra = extra or None
+        return record
+
+    @staticmethod
+    def _pack_io_operations(io_operations, intern) -> array:
+        packed = array("I")
+        for op in io_operations:
+            op = parse_io_operation(op)
+            packed.extend((intern(op.operation), op.line, op.col, intern(op.category)))
+        return packed
+
+    def remapped(self, id_map) -> "FileAnalysis":
+        """Copy of the record with its IDs translated through id_map (another store's ID -> this store's ID)."""
+        usage = array("I")
+        for module_id, symbol_ids in self.iter_function_usage():
+            usage.append(id_map[module_id])
+            usage.append(len(symbol_ids))
+            usage.extend(id_map[symbol_id] for symbol_id in symbol_ids)
+        io_operations = None
+        if self.io_operations is not None:
+            io_operations = array("I")
+            for op_id, line, col, category_id in self.iter_io_operation_ids():
+                io_operations.extend((id_map[op_id], line, col, id_map[category_id]))
+        return FileAnalysis(array("I", (id_map[module_id] for module_id in self.imports)), self.io_count,
+                            usage, io_operations, self.path, self.size, self.lines, self.empty, self.info_extra)
+
+    @property
+    def has_file_info(self) -> bool:
+        return self.size is not None
+
+    def iter_function_usage(self) -> Iterator[Tuple[int, array]]:
+        """Yield (module ID, symbol IDs) pairs."""
+        usage = self.function_usage
+        pos = 0
+        while pos < len(usage):
+            count = usage[pos + 1]
+            yield usage[pos], usage[pos + 2:pos + 2 + count]
+            pos += 2 + count
+
+    def iter_io_operation_ids(self) -> Iterator[Tuple[int, int, int, int]]:
+        """Yield (operation ID, line, col, category ID) for each I/O operation."""
+        ops = self.io_operations
+        if ops:
+            for pos in range(0, len(ops), 4):
+                yield ops[pos], ops[pos + 1], ops[pos + 2], ops[pos + 3]
+
+    def get_io_operations(self, symbols: SymbolTable) -> List[IOOperation]:
+        names = symbols.names
+        return [IOOperation(names[op_id], line, col, names[category_id])
+                for op_id, line, col, category_id in self.iter_io_operation_ids()]
+
+    def to_file_entry(self, symbols: SymbolTable) -> Dict[str, Any]:
+        """The record's "files" entry, as in the JSON export."""
+        names = symbols.names
+        return {
+            "imports": [names[module_id] for module_id in self.imports],
+            "io_count": self.io_count,
+            "function_usage": {
+                names[module_id]: [names[symbol_id] for symbol_id in symbol_ids]
+                for module_id, symbol_ids in self.iter_function_usage()
+            },
+        }
+
+    def to_file_info(self) -> Optional[Dict[str, Any]]:
+        """The record's "file_info" entry, or None if the analysis had none."""
+        if not self.has_file_info:
+            return None
+        file_info = {"path": self.path, "size": self.size, "lines": self.lines, "empty": self.empty}
+        if self.info_extra:
+            file_info.update(self.info_extra)
+        return file_info
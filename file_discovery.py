@@ -0,0 +1,104 @@
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Iterator, List, Optional, Tuple
+from exclusions import GITIGNORE, Exclusions
+
+PY_SUFFIXES = (".py", ".pyw")
+
+def _scan(path: str, rel_dir: str, exclusions: Exclusions, file_filter: Optional[Callable[[str], bool]],
+          stat: bool):
+    """
+    List one directory: (path, kept directory names, (path, relative path) of the
+    directories to descend into, kept file entries, exclusions for the subtree), or None
+    if it can't be read. Runs on the walker's threads.
+    """
+    names: List[str] = []
+    subdirs: List[Tuple[str, str]] = []
+    files: List[os.DirEntry] = []
+    try:
+        with os.scandir(path) as it:
+            entries = list(it)
+    except OSError:
+        return None
+    if exclusions.gitignore and any(entry.name == GITIGNORE for entry in entries):
+        exclusions = exclusions.with_gitignore(path, rel_dir)
+    prefix = rel_dir + "/" if rel_dir else ""
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        if is_dir:
+            if exclusions.excludes(prefix + entry.name, True):
+                continue  # pruned with everything below it
+            names.append(entry.name)
+            try:
+                is_link = entry.is_symlink()
+            except OSError:
+                is_link = False
+            if not is_link:  # like os.walk, list linked directories but don't follow them
+                subdirs.append((entry.path, prefix + entry.name))
+        elif ((file_filter is None or file_filter(entry.name))
+              and not exclusions.excludes(prefix + entry.name, False)):
+            if stat:
+                try:
+                    entry.stat()  # cached on the entry for whoever needs it next
+                except OSError:
+                    pass
+            files.append(entry)
+    return path, names, subdirs, files, exclusions
+
+def walk(top: str, exclusions: Optional[Exclusions] = None, file_filter: Optional[Callable[[str], bool]] = None,
+         stat: bool = False, workers: Optional[int] = None) -> Iterator[Tuple[str, List[str], List[os.DirEntry]]]:
+    """
+    Walk a tree like os.walk(top), yielding (directory, subdirectory names, file entries).
+
+    Directories excluded by exclusions (see exclusions.Exclusions; matched on paths
+    relative to top) are pruned with everything below them, and only files whose name
+    passes file_filter and that aren't excluded are kept. Each directory is listed with a single
+    os.scandir() call on a pool of workers threads (1 = no threads, None = the
+    ThreadPoolExecutor default), so subtrees are read concurrently while the caller
+    consumes earlier results; with stat, kept files are also stat()ed there and the
+    result cached on their os.DirEntry. Results are yielded as soon as they are ready,
+    in exactly os.walk's (top-down) order.
+    """
+    if exclusions is None:
+        exclusions = Exclusions()
+    executor = ThreadPoolExecutor(max_workers=workers) if workers != 1 else None
+
+    def submit(path: str, rel_dir: str, subtree_exclusions: Exclusions) -> Future:
+        args = (path, rel_dir, subtree_exclusions, file_filter, stat)
+        if executor is not None:
+            return executor.submit(_scan, *args)
+        future = Future()
+        future.set_result(_scan(*args))
+        return future
+
+    try:
+        stack = [submit(top, "", exclusions)]
+        while stack:
+            result = stack.pop().result()
+            if result is None:
+                continue
+            path, names, subdirs, files, subtree_exclusions = result
+            yield path, names, files
+            # Start listing the subdirectories right away, popping them in listing order
+            stack.extend(reversed([submit(subdir, rel_dir, subtree_exclusions) for subdir, rel_dir in subdirs]))
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+def is_py_file(name: str) -> bool:
+    return name.endswith(PY_SUFFIXES)
+
+def iter_py_files(top: str, exclusions: Optional[Exclusions] = None, stat: bool = False,
+                  workers: Optional[int] = None) -> Iterator[os.DirEntry]:
+    """
+    Stream the .py/.pyw files under top as os.DirEntry objects (entry.path is the path
+    os.walk would give), in os.walk order. exclusions defaults to the usual excluded
+    directories (exclusions.DEFAULT_EXCLUDE_DIRS).
+    """
+    if exclusions is None:
+        exclusions = Exclusions.from_names()
+    for _, _, files in walk(top, exclusions, is_py_file, stat=stat, workers=workers):
+        yield from files
@@ -3,6 +3,8 @@ import os
 import json
 from pathlib import Path
 from worker import dependency_store_maker, graph_maker
+from exclusions import Exclusions
+from file_discovery import is_py_file, walk
 import matplotlib.pyplot as plt
 import io
 import base64
@@ -18,19 +20,13 @@ def get_file_icon(file_path):
     else:
         return "📄"
 
-def get_directory_structure(path, exclude_dirs=None, exclude_files=None):
-    """Get directory structure for display"""
-    if exclude_dirs is None:
-        exclude_dirs = ["venv", ".git", "__pycache__"]
-    if exclude_files is None:
-        exclude_files = []
+def get_directory_structure(path, exclude_dirs=None, exclude_files=None, exclude_patterns=None, use_gitignore=False):
+    """Get directory structure for display (exclusions as in worker.find_py_files)"""
+    exclusions = Exclusions.from_names(exclude_dirs, exclude_files, exclude_patterns or (), use_gitignore)
     
     structure = []
     try:
-        for root, dirs, files in os.walk(path):
-            # Filter out excluded directories
-            dirs[:] = [d for d in dirs if d not in exclude_dirs]
-            
+        for root, dirs, files in walk(path, exclusions, is_py_file):
             # Get relative path from the base path
             rel_path = os.path.relpath(root, path)
             if rel_path == '.':
@@ -47,15 +43,14 @@ def get_directory_structure(path, exclude_dirs=None, exclude_files=None):
                 })
             
             # Add files
-            for file_name in sorted(files):
-                if file_name not in exclude_files and file_name.endswith(('.py', '.pyw')):
-                    file_path = os.path.join(rel_path, file_name) if rel_path else file_name
-                    structure.append({
-                        'type': 'file',
-                        'name': file_name,
-                        'path': file_path,
-                        'icon': get_file_icon(file_name)
-                    })
+            for file_name in sorted(entry.name for entry in files):
+                file_path = os.path.join(rel_path, file_name) if rel_path else file_name
+                structure.append({
+                    'type': 'file',
+                    'name': file_name,
+                    'path': file_path,
+                    'icon': get_file_icon(file_name)
+                })
     except Exception as e:
         st.error(f"Error reading directory structure: {e}")
     
@@ -165,6 +160,10 @@ def main():
         st.session_state.exclude_as_per_rqst_dirs = []
     if 'exclude_as_per_rqst_files' not in st.session_state:
         st.session_state.exclude_as_per_rqst_files = []
+    if 'exclude_patterns' not in st.session_state:
+        st.session_state.exclude_patterns = []
+    if 'use_gitignore' not in st.session_state:
+        st.session_state.use_gitignore = False
     if 'analysis_complete' not in st.session_state:
         st.session_state.analysis_complete = False
     if 'dependency_store' not in st.session_state:
@@ -355,13 +354,25 @@ def main():
         </div>
         """, unsafe_allow_html=True)
         
+        st.session_state.use_gitignore = st.checkbox(
+            "Exclude what the codebase's .gitignore files list",
+            value=st.session_state.use_gitignore
+        )
+        patterns = st.text_input(
+            "Exclude patterns (comma-separated, .gitignore syntax, e.g. build/, *_pb2.py):",
+            value=", ".join(st.session_state.exclude_patterns)
+        )
+        st.session_state.exclude_patterns = [p.strip() for p in patterns.split(",") if p.strip()]
+        
         col1, col2 = st.columns(2)
         
         with col1:
             st.markdown("### 📁 Exclude Directories")
             
             # Get directories from codebase
-            structure = get_directory_structure(st.session_state.codebase_path)
+            structure = get_directory_structure(st.session_state.codebase_path,
+                                                exclude_patterns=st.session_state.exclude_patterns,
+                                                use_gitignore=st.session_state.use_gitignore)
             directories = [item for item in structure if item['type'] == 'directory']
             
             if directories:
@@ -468,13 +479,17 @@ def main():
             with col1:
                 st.markdown(f"**📁 Codebase:** {st.session_state.codebase_path}")
                 st.markdown(f"**🎯 Main File:** {st.session_state.main_file}")
-                structure = get_directory_structure(st.session_state.codebase_path)
+                structure = get_directory_structure(st.session_state.codebase_path,
+                                                    exclude_patterns=st.session_state.exclude_patterns,
+                                                    use_gitignore=st.session_state.use_gitignore)
                 python_files = [item for item in structure if item['type'] == 'file']
                 st.markdown(f"**📊 Python Files:** {len(python_files)}")
             
             with col2:
                 st.markdown(f"**🚫 Excluded Dirs:** {len(st.session_state.exclude_as_per_rqst_dirs)}")
                 st.markdown(f"**🚫 Excluded Files:** {len(st.session_state.exclude_as_per_rqst_files)}")
+                st.markdown(f"**🚫 Exclude Patterns:** {len(st.session_state.exclude_patterns)}"
+                            f"{' + .gitignore' if st.session_state.use_gitignore else ''}")
             
             # Generate button
             if st.button("🚀 Start Analysis", type="primary", use_container_width=True):
@@ -492,7 +507,9 @@ def main():
                         dependency_store, num_py_files = dependency_store_maker(
                             folder_path=st.session_state.codebase_path,
                             exclude_dirs=exclude_dirs,
-                            exclude_files=exclude_files
+                            exclude_files=exclude_files,
+                            exclude_patterns=st.session_state.exclude_patterns,
+                            use_gitignore=st.session_state.use_gitignore
                         )
                         
                         st.session_state.dependency_store = dependency_store
@@ -738,7 +755,8 @@ def main():
             if st.button("🔄 Start New Analysis", use_container_width=True):
                 # Reset session state
                 for key in ['current_step', 'codebase_path', 'main_file', 'exclude_as_per_rqst_dirs', 
-                           'exclude_as_per_rqst_files', 'analysis_complete', 'dependency_store', 
+                           'exclude_as_per_rqst_files', 'exclude_patterns', 'use_gitignore',
+                           'analysis_complete', 'dependency_store', 
                            'num_py_files', 'dependency_graph_fig']:
                     if key in st.session_state:
                         del st.session_state[key]
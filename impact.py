@@ -0,0 +1,122 @@
+import json
+import os
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from dependency_graph import DependencyGraph
+
+IMPACT_VERSION = 2  # 2: package imports resolve to __init__.py
+_IMPACT_MAGIC = b"CFGIMP"
+
+def impact_index_path(store_path: Path) -> Path:
+    """Sidecar file holding the impact index of a saved store."""
+    return store_path.with_name(store_path.name + ".impact")
+
+def store_file_path(file_path: str, root: Optional[str] = None) -> str:
+    """
+    A path as the store keys it: relative to the codebase root, with forward slashes.
+    root, if given, is the codebase root the path is (absolute, or relative to the
+    current directory) under, e.g. to use `git diff --name-only` output from the repo root.
+    """
+    if root is not None:
+        file_path = os.path.relpath(file_path, root)
+    file_path = file_path.replace("\\", "/")
+    while file_path.startswith("./"):
+        file_path = file_path[2:]
+    return file_path
+
+class ImpactIndex:
+    """
+    Reverse file-level import graph of a store, for change-impact queries.
+
+    Each analyzed file's importers (resolved as in DependencyGraph) are kept in flat
+    arrays, so finding what a change affects is one breadth-first walk over the affected
+    files. Saved as a small ".impact" sidecar next to the store, which a CI job can read
+    in milliseconds instead of loading the whole store and resolving every import again.
+    """
+    __slots__ = ("files", "starts", "importers", "_index")
+
+    def __init__(self, files: List[str], starts: array, importers: array):
+        self.files = files
+        self.starts = starts  # file index -> start of its importers; one extra end entry
+        self.importers = importers  # importer file indexes, grouped by imported file
+        self._index: Optional[Dict[str, int]] = None
+
+    @classmethod
+    def from_graph(cls, graph: DependencyGraph) -> "ImpactIndex":
+        grouped: List[List[int]] = [[] for _ in graph.files]
+        for importer, targets in enumerate(graph.edges):
+            for target in targets:
+                grouped[target].append(importer)
+        starts, importers = array("I", [0]), array("I")
+        for group in grouped:
+            importers.extend(group)
+            starts.append(len(importers))
+        return cls(list(graph.files), starts, importers)
+
+    def impacted(self, changed_files: Iterable[str], include_changed: bool = False) -> List[str]:
+        """
+        Every analyzed file that imports any of changed_files, directly or transitively, in
+        store order. With include_changed, the changed files themselves come first (analyzed
+        or not, e.g. a new test file).
+        """
+        if self._index is None:
+            self._index = {file_path: i for i, file_path in enumerate(self.files)}
+        changed_files = list(dict.fromkeys(changed_files))
+        starts, importers = self.starts, self.importers
+        frontier = [i for i in map(self._index.get, changed_files) if i is not None]
+        seen = set(frontier)
+        reached = []
+        while frontier:
+            next_frontier = []
+            for i in frontier:
+                for importer in importers[starts[i]:starts[i + 1]]:
+                    if importer not in seen:
+                        seen.add(importer)
+                        reached.append(importer)
+                        next_frontier.append(importer)
+            frontier = next_frontier
+        impacted = [self.files[i] for i in sorted(reached)]
+        return changed_files + impacted if include_changed else impacted
+
+    def save(self, path: Path, size: int, mtime_ns: int):
+        """Write the index for a store file of the given size and mtime."""
+        files = "\0".join(self.files).encode("utf-8")
+        header = {"version": IMPACT_VERSION, "size": size, "mtime_ns": mtime_ns,
+                  "files": len(self.files), "files_len": len(files), "importers": len(self.importers)}
+        with open(path, "wb") as f:
+            f.write(_IMPACT_MAGIC + json.dumps(header).encode("utf-8") + b"\n")
+            f.write(files)
+            f.write(self.starts.tobytes())
+            f.write(self.importers.tobytes())
+
+    @classmethod
+    def read(cls, path: Path, size: int, mtime_ns: int) -> Optional["ImpactIndex"]:
+        """Read an index saved for a store file of the given size and mtime, else None."""
+        with open(path, "rb") as f:
+            if f.read(len(_IMPACT_MAGIC)) != _IMPACT_MAGIC:
+                return None
+            header = json.loads(f.readline())
+            if (header.get("version") != IMPACT_VERSION or header.get("size") != size
+                    or header.get("mtime_ns") != mtime_ns):
+                return None
+            files = f.read(header["files_len"]).decode("utf-8").split("\0") if header["files"] else []
+            starts, importers = array("I"), array("I")
+            starts.frombytes(f.read((header["files"] + 1) * starts.itemsize))
+            importers.frombytes(f.read(header["importers"] * importers.itemsize))
+        return cls(files, starts, importers)
+
+def write_impact_index(store_path: Path, graph: DependencyGraph) -> ImpactIndex:
+    """Build the impact index of a store's graph and save it next to the store file."""
+    index = ImpactIndex.from_graph(graph)
+    st = store_path.stat()
+    index.save(impact_index_path(store_path), st.st_size, st.st_mtime_ns)
+    return index
+
+def read_impact_index(store_path: Path) -> Optional[ImpactIndex]:
+    """The saved impact index of the store file at store_path, or None if missing, corrupt or stale."""
+    try:
+        st = store_path.stat()
+        return ImpactIndex.read(impact_index_path(store_path), st.st_size, st.st_mtime_ns)
+    except (OSError, ValueError, KeyError, TypeError, EOFError):
+        return None
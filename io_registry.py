@@ -0,0 +1,215 @@
+import hashlib
+import os
+from importlib import metadata
+from typing import Dict, Iterable, Optional
+
+# Calls the analyzer reports as I/O operations, as "<module>.<function>" after alias resolution,
+# grouped by the category recorded with each operation
+BUILTIN_IO_PATTERNS = {
+    "file": (
+        "open", "gzip.open", "bz2.open", "lzma.open",
+    ),
+    "csv": (
+        "csv.reader", "csv.writer", "csv.DictReader", "csv.DictWriter",
+    ),
+    "json": (
+        "json.load", "json.dump", "json.loads", "json.dumps",
+    ),
+    "pickle": (
+        "pickle.load", "pickle.dump", "pickle.loads", "pickle.dumps",
+    ),
+    "pandas": (
+        "pandas.read_csv", "pandas.read_json", "pandas.read_excel",
+        "pandas.read_parquet", "pandas.read_feather", "pandas.read_hdf",
+        "pandas.read_sql", "pandas.read_html", "pandas.read_xml",
+        "pandas.to_csv", "pandas.to_json", "pandas.to_excel",
+        "pandas.to_parquet", "pandas.to_feather", "pandas.to_hdf",
+        "pandas.to_sql", "pandas.to_html", "pandas.to_xml",
+    ),
+    "pytorch": (
+        "torch.load", "torch.save", "torch.load_state_dict", "torch.save_state_dict",
+        "torch.utils.data.DataLoader",
+    ),
+    "numpy": (
+        "numpy.load", "numpy.save", "numpy.loadtxt", "numpy.savetxt",
+        "numpy.fromfile", "numpy.tofile", "numpy.genfromtxt",
+    ),
+    "pathlib": (
+        "Path.open", "Path.read_text", "Path.write_text",
+        "Path.read_bytes", "Path.write_bytes", "Path.mkdir",
+        "Path.rmdir", "Path.unlink", "Path.touch",
+    ),
+    "io": (
+        "io.open", "io.StringIO", "io.BytesIO", "io.TextIOWrapper",
+    ),
+    "shutil": (
+        "shutil.copy", "shutil.copy2", "shutil.copyfile",
+        "shutil.copytree", "shutil.move", "shutil.rmtree",
+    ),
+    "zipfile": (
+        "zipfile.ZipFile", "zipfile.PyZipFile", "zipfile.open",
+    ),
+    "tarfile": (
+        "tarfile.open", "tarfile.TarFile",
+    ),
+    "database": (
+        "sqlite3.connect", "sqlalchemy.create_engine",
+    ),
+    "network": (
+        "requests.get", "requests.post", "requests.put", "requests.delete",
+        "urllib.request.urlopen", "urllib.request.urlretrieve",
+    ),
+    "config": (
+        "configparser.ConfigParser.read", "configparser.ConfigParser.write",
+        "yaml.safe_load", "yaml.dump", "yaml.safe_dump",
+        "toml.load", "toml.dump", "toml.loads", "toml.dumps",
+    ),
+    "image": (
+        "PIL.Image.open", "PIL.Image.save", "cv2.imread", "cv2.imwrite",
+    ),
+    "audio": (
+        "librosa.load", "librosa.output.write_wav",
+    ),
+    "ml": (
+        "sklearn.model_selection.load_svmlight_file",
+        "joblib.load", "joblib.dump",
+    ),
+    "hdf5": (
+        "h5py.File", "h5py.Group.create_dataset", "h5py.Dataset.read",
+    ),
+    "excel": (
+        "openpyxl.load_workbook", "openpyxl.Workbook.save",
+    ),
+    "xml": (
+        "xml.etree.ElementTree.parse", "xml.etree.ElementTree.write",
+        "lxml.etree.parse", "lxml.etree.write",
+    ),
+    "pdf": (
+        "PyPDF2.PdfReader", "PyPDF2.PdfWriter.write",
+    ),
+    "archive": (
+        "rarfile.RarFile", "rarfile.RarFile.extract",
+    ),
+    "cloud": (
+        "boto3.client", "google.cloud.storage.Client",
+        "azure.storage.blob.BlobServiceClient",
+    ),
+    "streamlit": (
+        "streamlit.file_uploader", "streamlit.download_button",
+    ),
+    "matplotlib": (
+        "matplotlib.pyplot.savefig", "matplotlib.pyplot.imsave",
+    ),
+    "plotly": (
+        "plotly.io.write_html", "plotly.io.write_image",
+    ),
+    "seaborn": (
+        "seaborn.savefig",
+    ),
+    "altair": (
+        "altair.save", "altair.renderer.save",
+    ),
+}
+
+# Extra patterns are read from this file (one per line, optionally "pattern = category",
+# "#" comments) and from entry points in this group, each resolving to an iterable of patterns,
+# a {category: patterns} dict, or a callable returning either
+IO_PATTERNS_FILE_ENV = "CODEFLOW_IO_PATTERNS"
+IO_PATTERNS_FILE = "io_patterns.txt"
+IO_PATTERNS_ENTRY_POINT_GROUP = "codeflow_graphmaker.io_patterns"
+DEFAULT_CATEGORY = "custom"
+
+class IORegistry:
+    """
+    Registry of I/O call patterns and their categories, indexed by module prefix.
+
+    "urllib.request.urlopen" is stored as by_module["urllib.request"]["urlopen"] = "network",
+    so a call is checked with one dict probe on its resolved module (which rejects almost
+    every non-I/O call) plus one probe on the function name, no matter how many patterns
+    are registered.
+    """
+
+    def __init__(self, patterns: Optional[Dict[str, Iterable[str]]] = None):
+        self.by_module: Dict[str, Dict[str, str]] = {}  # module -> {function -> category}
+        self.bare: Dict[str, str] = {}  # patterns without a module, e.g. "open"
+        for category, category_patterns in (patterns or {}).items():
+            self.register(category_patterns, category)
+
+    def register(self, patterns: Iterable[str], category: str = DEFAULT_CATEGORY):
+        """Add patterns such as "mylib.io.read_blob" under a category."""
+        for pattern in patterns:
+            pattern = pattern.strip()
+            if not pattern:
+                continue
+            module, sep, function = pattern.rpartition(".")
+            if sep:
+                self.by_module.setdefault(module, {})[function] = category
+            else:
+                self.bare[pattern] = category
+
+    def matches(self, module: str, function: str) -> Optional[str]:
+        """Category of module.function if calling it is an I/O operation, else None."""
+        functions = self.by_module.get(module)
+        return functions.get(function) if functions is not None else None
+
+    def category(self, full_name: str) -> Optional[str]:
+        """Category of a pattern such as "json.load" or "open", or None if it isn't registered."""
+        module, sep, function = full_name.rpartition(".")
+        return self.matches(module, function) if sep else self.bare.get(full_name)
+
+    def __contains__(self, full_name: str) -> bool:
+        return self.category(full_name) is not None
+
+    def __len__(self) -> int:
+        return len(self.bare) + sum(len(functions) for functions in self.by_module.values())
+
+    def load_file(self, filepath: str) -> bool:
+        """Register the patterns listed in a text file ("pattern" or "pattern = category" lines)."""
+        if not os.path.exists(filepath):
+            return False
+        with open(filepath, "r", encoding="utf-8") as f:
+            for line in f:
+                pattern, _, category = line.split("#", 1)[0].partition("=")
+                self.register([pattern], category.strip() or DEFAULT_CATEGORY)
+        return True
+
+    def load_entry_points(self, group: str = IO_PATTERNS_ENTRY_POINT_GROUP) -> int:
+        """Register patterns contributed by installed plugins; returns how many plugins loaded."""
+        eps = metadata.entry_points()
+        selected = eps.select(group=group) if hasattr(eps, "select") else eps.get(group, [])
+        loaded = 0
+        for ep in selected:
+            try:
+                patterns = ep.load()
+                if callable(patterns):
+                    patterns = patterns()
+                if isinstance(patterns, dict):
+                    for category, category_patterns in patterns.items():
+                        self.register(category_patterns, category)
+                else:
+                    self.register(patterns)
+                loaded += 1
+            except Exception as e:
+                print(f"Error loading I/O patterns from plugin {ep.name}: {e}")
+        return loaded
+
+    def fingerprint(self) -> str:
+        """Stable summary of the registered patterns, used to invalidate cached analyses."""
+        patterns = sorted(f"{pattern}={category}" for pattern, category in self.bare.items()) + sorted(
+            f"{module}.{function}={category}"
+            for module, functions in self.by_module.items() for function, category in functions.items()
+        )
+        digest = hashlib.blake2b("\n".join(patterns).encode("utf-8"), digest_size=8).hexdigest()
+        return f"{len(patterns)}:{digest}"
+
+def default_registry(patterns_file: Optional[str] = None) -> IORegistry:
+    """Built-in patterns plus the patterns file and any installed plugins."""
+    registry = IORegistry(BUILTIN_IO_PATTERNS)
+    registry.load_file(patterns_file or os.environ.get(IO_PATTERNS_FILE_ENV, IO_PATTERNS_FILE))
+    registry.load_entry_points()
+    return registry
+
+# Built once per process (worker processes build their own on import). Patterns added with
+# IO_REGISTRY.register() at runtime are only seen by the process that added them; use the
+# patterns file or an entry point for anything parallel analysis should pick up.
+IO_REGISTRY = default_registry()
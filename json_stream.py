@@ -0,0 +1,224 @@
+import bz2
+import gzip
+import json
+import lzma
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Compression is picked by file suffix, on both save and load
+COMPRESSORS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "bz2": ".bz2", "xz": ".xz"}
+
+Sections = Iterable[Tuple[str, Iterable[Tuple[str, Any]]]]
+
+def with_compression(path: Path, compression: Optional[str]) -> Path:
+    """path with the suffix for compression ("gzip", "bz2", "xz") appended if missing."""
+    if compression is None:
+        return path
+    if compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Unknown compression {compression!r}, expected one of {sorted(COMPRESSION_SUFFIXES)}")
+    suffix = COMPRESSION_SUFFIXES[compression]
+    return path if path.suffix == suffix else path.with_name(path.name + suffix)
+
+def open_json(path: Path, mode: str = "r"):
+    """Open a (possibly compressed) JSON file in text mode."""
+    opener = COMPRESSORS.get(Path(path).suffix, open)
+    return opener(path, mode + "t", encoding="utf-8")
+
+def write_sections(f, sections: Sections, compact: bool = False,
+                   offsets: Optional[Dict[str, Dict[str, List[int]]]] = None):
+    """
+    Write a two-level JSON object, one value at a time.
+
+    sections yields (name, pairs) and each pairs iterable yields (key, value); only one
+    value (or list item) is serialized at a time, so memory use doesn't grow with the
+    document. The output is byte-identical to json.dump(document, f, indent=2), or to
+    json.dump(document, f, separators=(",", ":")) when compact.
+
+    If offsets is given, it is filled with section -> key -> [start, end] character
+    offsets of each value (byte offsets too, as the output is ASCII-only).
+    """
+    if compact:
+        indent, item_sep, key_sep = None, ",", ":"
+    else:
+        indent, item_sep, key_sep = 2, ",", ": "
+    pos = 0
+
+    def write(text):
+        nonlocal pos
+        f.write(text)
+        pos += len(text)
+
+    def newline(level):
+        return "\n" + " " * (indent * level) if indent else ""
+
+    def write_object(pairs, level, write_value, spans=None):
+        write("{")
+        first = True
+        for key, value in pairs:
+            write(("" if first else item_sep) + newline(level + 1) + json.dumps(key) + key_sep)
+            start = pos
+            write_value(value, level + 1, key)
+            if spans is not None:
+                spans[key] = [start, pos]
+            first = False
+        if not first:
+            write(newline(level))
+        write("}")
+
+    def write_value(value, level, key=None):
+        if isinstance(value, list) and value:
+            # Lists (e.g. a module's dependents) can be as long as the repo: write per item
+            write("[")
+            for i, item in enumerate(value):
+                write(("," if i else "") + newline(level + 1))
+                write_value(item, level + 1)
+            write(newline(level) + "]")
+            return
+        text = json.dumps(value, indent=indent, separators=(item_sep, key_sep))
+        write(text.replace("\n", newline(level)) if indent else text)
+
+    def write_section(pairs, level, name):
+        spans = offsets.setdefault(name, {}) if offsets is not None else None
+        write_object(pairs, level, write_value, spans)
+
+    write_object(sections, 0, write_section)
+
+INDEX_VERSION = 2
+_INDEX_MAGIC = b"CFGIDX"
+
+def index_path(path: Path) -> Path:
+    """Sidecar file holding the offsets index of a saved JSON document."""
+    return path.with_name(path.name + ".idx")
+
+class OffsetIndex:
+    """
+    Byte-offset index of a two-level JSON document: section -> key -> (start, end).
+
+    Keys are kept as one NUL-joined blob per section and offsets in one flat array, so
+    reading the index is a couple of bulk reads; a section's key lookup table is only
+    built the first time that section is queried.
+    """
+    __slots__ = ("_keys", "_offsets", "_lookup")
+
+    def __init__(self, keys: Dict[str, bytes], offsets: Dict[str, array]):
+        self._keys = keys  # section -> NUL-joined UTF-8 keys
+        self._offsets = offsets  # section -> [start0, end0, start1, end1, ...]
+        self._lookup: Dict[str, Dict[str, int]] = {}
+
+    @classmethod
+    def from_offsets(cls, offsets: Dict[str, Dict[str, List[int]]]) -> "OffsetIndex":
+        """From the offsets filled by write_sections() or scan_offsets()."""
+        return cls({name: "\0".join(spans).encode("utf-8") for name, spans in offsets.items()},
+                   {name: array("Q", [pos for span in spans.values() for pos in span])
+                    for name, spans in offsets.items()})
+
+    def keys(self, section: str) -> List[str]:
+        blob = self._keys.get(section)
+        return blob.decode("utf-8").split("\0") if blob else []
+
+    def span(self, section: str, key: str) -> Optional[Tuple[int, int]]:
+        lookup = self._lookup.get(section)
+        if lookup is None:
+            keys = self.keys(section)
+            lookup = self._lookup[section] = dict(zip(keys, range(0, 2 * len(keys), 2)))
+        pos = lookup.get(key)
+        if pos is None:
+            return None
+        offsets = self._offsets[section]
+        return offsets[pos], offsets[pos + 1]
+
+    def save(self, path: Path, size: int, mtime_ns: int):
+        """Write the index for a document of the given size and mtime."""
+        header = {"version": INDEX_VERSION, "size": size, "mtime_ns": mtime_ns,
+                  "sections": [[name, len(self._keys[name]), len(self._offsets[name])] for name in self._keys]}
+        with open(path, "wb") as f:
+            f.write(_INDEX_MAGIC + json.dumps(header).encode("utf-8") + b"\n")
+            for name in self._keys:
+                f.write(self._keys[name])
+                f.write(self._offsets[name].tobytes())
+
+    @classmethod
+    def read(cls, path: Path, size: int, mtime_ns: int) -> Optional["OffsetIndex"]:
+        """Read an index saved for a document of the given size and mtime, else None."""
+        with open(path, "rb") as f:
+            if f.read(len(_INDEX_MAGIC)) != _INDEX_MAGIC:
+                return None
+            header = json.loads(f.readline())
+            if (header.get("version") != INDEX_VERSION or header.get("size") != size
+                    or header.get("mtime_ns") != mtime_ns):
+                return None
+            keys, offsets = {}, {}
+            for name, keys_len, num_offsets in header["sections"]:
+                keys[name] = f.read(keys_len)
+                offsets[name] = array("Q")
+                offsets[name].frombytes(f.read(num_offsets * offsets[name].itemsize))
+        return cls(keys, offsets)
+
+def write_index(path: Path, offsets: Dict[str, Dict[str, List[int]]]) -> OffsetIndex:
+    """Save the offsets filled by write_sections() next to the document at path."""
+    index = OffsetIndex.from_offsets(offsets)
+    st = path.stat()
+    index.save(index_path(path), st.st_size, st.st_mtime_ns)
+    return index
+
+def read_index(path: Path) -> Optional[OffsetIndex]:
+    """The saved offsets index of the document at path, or None if missing, corrupt or stale."""
+    try:
+        st = path.stat()
+        return OffsetIndex.read(index_path(path), st.st_size, st.st_mtime_ns)
+    except (OSError, ValueError, KeyError, TypeError, EOFError):
+        return None
+
+def scan_offsets(data) -> Dict[str, Dict[str, List[int]]]:
+    """
+    Build the write_sections() offsets of an existing two-level JSON document.
+
+    Every value is still decoded once to find where it ends, but none is kept.
+    """
+    # latin-1 maps bytes 1:1 to characters, so string offsets are byte offsets; UTF-8
+    # multi-byte sequences never contain JSON's structural ASCII characters
+    text = str(data, "latin-1")
+    decoder = json.JSONDecoder()
+    whitespace = " \t\n\r"
+
+    def skip(pos, expected=None):
+        while text[pos] in whitespace:
+            pos += 1
+        if expected is not None:
+            if text[pos] != expected:
+                raise ValueError(f"Expected {expected!r} at offset {pos}")
+            pos += 1
+        return pos
+
+    def read_object(pos, read_value):
+        """Yield (key, value start) for each member; read_value returns the value's end."""
+        pos = skip(skip(pos, "{"))
+        if text[pos] == "}":
+            return pos + 1
+        while True:
+            key_start = skip(pos)
+            pos = decoder.raw_decode(text, key_start)[1]
+            key = json.loads(text[key_start:pos].encode("latin-1").decode("utf-8"))
+            pos = skip(pos, ":")
+            start = skip(pos)
+            pos = read_value(key, start)
+            pos = skip(pos)
+            if text[pos] == "}":
+                return pos + 1
+            pos = skip(pos, ",")
+
+    offsets = {}
+
+    def read_section(name, start):
+        spans = offsets[name] = {}
+
+        def read_value(key, value_start):
+            end = decoder.raw_decode(text, value_start)[1]
+            spans[key] = [value_start, end]
+            return end
+        return read_object(start, read_value)
+
+    read_object(0, read_section)
+    return offsets
@@ -0,0 +1,138 @@
+import json
+import mmap
+from functools import wraps
+from typing import Dict, List, Any, Optional
+from analyzer import IOOperation
+from dependency_store import DependencyStore
+from file_analysis import FileAnalysis
+from json_stream import OffsetIndex, read_index, scan_offsets, write_index
+
+class LazyDependencyStore(DependencyStore):
+    """
+    DependencyStore opened from a saved dependencies JSON without parsing all of it.
+
+    open() memory-maps the file and reads its byte-offset index (the ".idx" sidecar
+    written by save(index=True), or built with one scan and cached if missing or stale).
+    Per-file getters, get_module_dependents, get_summary and get_all_files then decode
+    only the entries they need, memoizing file records on first access. Any other call
+    (queries over all files, updates, save) loads the whole store first, after which it
+    behaves exactly like DependencyStore.
+    """
+
+    def __init__(self, output_dir: str = "output_files"):
+        super().__init__(output_dir)
+        self._file = None
+        self._data: Optional[mmap.mmap] = None
+        self._index: Optional[OffsetIndex] = None
+        self._filename: Optional[str] = None
+
+    def open(self, filename: str = "dependencies.json") -> bool:
+        """Open a saved (uncompressed) dependencies JSON for lazy access."""
+        self.close()
+        input_path = self.output_dir / filename
+        if not input_path.exists():
+            return False
+        self._file = open(input_path, 'rb')
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        index = read_index(input_path)
+        if index is None:
+            offsets = scan_offsets(self._data)
+            try:
+                index = write_index(input_path, offsets)
+            except OSError:
+                index = OffsetIndex.from_offsets(offsets)  # read-only location: rescan next time
+        self._index = index
+        self._filename = filename
+        self._graph = self._resolver = None
+        self.summary = {key: self._read("summary", key) for key in index.keys("summary")}
+        return True
+
+    def close(self):
+        """Release the memory map (a store that was fully loaded stays usable)."""
+        if self._data is not None:
+            self._data.close()
+            self._file.close()
+        self._file = self._data = self._index = None
+
+    @property
+    def is_lazy(self) -> bool:
+        """True until something needed the whole store loaded."""
+        return self._index is not None
+
+    def _read(self, section: str, key: str, default: Any = None) -> Any:
+        span = self._index.span(section, key)
+        if span is None:
+            return default
+        start, end = span
+        return json.loads(self._data[start:end])
+
+    def _record(self, file_path: str) -> Optional[FileAnalysis]:
+        record = self.records.get(file_path)
+        if record is None:
+            file_entry = self._read("files", file_path)
+            if file_entry is None:
+                return None
+            record = self.records[file_path] = FileAnalysis.from_export(
+                self.symbols, file_entry, self._read("io_operations", file_path), self._read("file_info", file_path))
+        return record
+
+    def load_all(self):
+        """Parse the whole file into the store and drop the lazy state."""
+        if not self.is_lazy:
+            return
+        filename = self._filename
+        self.close()
+        super().load(filename)
+
+    def load(self, filename: str = "dependencies.json"):
+        """Load a file fully, as DependencyStore.load does."""
+        self.close()
+        return super().load(filename)
+
+    def load_snapshot(self, filename: str = "dependencies.snap"):
+        """Load a snapshot, as DependencyStore.load_snapshot does, dropping the lazy state."""
+        self.close()
+        return super().load_snapshot(filename)
+
+    def get_file_dependencies(self, file_path: str) -> Dict[str, Any]:
+        if not self.is_lazy:
+            return super().get_file_dependencies(file_path)
+        record = self._record(file_path)
+        return record.to_file_entry(self.symbols) if record is not None else {}
+
+    def get_file_io_operations(self, file_path: str) -> List[IOOperation]:
+        if not self.is_lazy:
+            return super().get_file_io_operations(file_path)
+        record = self._record(file_path)
+        return record.get_io_operations(self.symbols) if record is not None else []
+
+    def get_file_info(self, file_path: str) -> Dict[str, Any]:
+        if not self.is_lazy:
+            return super().get_file_info(file_path)
+        record = self._record(file_path)
+        return (record.to_file_info() or {}) if record is not None else {}
+
+    def get_module_dependents(self, module: str) -> List[str]:
+        if not self.is_lazy:
+            return super().get_module_dependents(module)
+        return self._read("modules", module, [])
+
+    def get_all_files(self) -> List[str]:
+        if not self.is_lazy:
+            return super().get_all_files()
+        return self._index.keys("files")
+
+def _loading_all(method):
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        self.load_all()
+        return method(self, *args, **kwargs)
+    return wrapper
+
+# Everything else needs every file; get_summary is served from the summary read on open()
+for _name in ("add_file_dependencies", "remove_file_dependencies", "update_files", "merge", "save", "save_snapshot",
+              "iter_sections", "get_all_dependencies", "get_files_with_io", "get_largest_files",
+              "get_most_imported_modules", "get_files_by_io_count", "get_files_by_io_operation",
+              "get_files_by_io_category", "get_files_using_function", "get_io_categories",
+              "iter_file_imports", "dependency_graph"):
+    setattr(LazyDependencyStore, _name, _loading_all(getattr(DependencyStore, _name)))
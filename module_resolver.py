@@ -0,0 +1,82 @@
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+PACKAGE_INIT = "__init__"
+
+def normalize_path(p: str) -> str:
+    """Case-folded, forward-slash form of a path with leading ./ and ../ parts stripped."""
+    p = p.replace("\\", "/")
+    while p.startswith("./") or p.startswith("../"):
+        p = p[p.find("/")+1:]
+    return p.lower()
+
+def module_path(file_path: str) -> Optional[Tuple[str, bool]]:
+    """
+    (case-folded path without the extension, is a .pyw) of a .py or .pyw file path
+    relative to the codebase root, or None for other files.
+    """
+    stem, ext = os.path.splitext(normalize_path(file_path))
+    if ext not in (".py", ".pyw"):
+        return None
+    return stem, ext == ".pyw"
+
+class ModuleResolver:
+    """
+    Maps imported module names to the analyzed files that define them.
+
+    The files are indexed once by case-folded path without the extension, which is how
+    module names are looked up: "pkg.mod" as "pkg/mod" and a package "pkg" through
+    "pkg/__init__.py". Any directory counts as a package, with or without an
+    __init__.py (namespace packages). A module is looked up from the codebase root
+    first, then in the importing file's directory: the analyzer records
+    "from .mod import x" as "mod", so that is where relative imports resolve, and as
+    paths rather than dotted names these also work under directories such as "v1.0"
+    that aren't valid package names. Module files are tried before package __init__
+    files, each as .py (root, then directory) before .pyw (root, then directory), so
+    "a/x.py" importing "pkg" gets its sibling "a/pkg.py" over a root "pkg.pyw". Lookups
+    are memoized per module and importing directory, misses included, so stores keep
+    one resolver for all their graph builds.
+    """
+
+    def __init__(self, all_files: Iterable[str]):
+        # path without extension -> file (as stored), per kind in lookup order: .py, .pyw
+        # modules, then .py, .pyw package __init__ files (keyed by their directory)
+        self.indexes: List[Dict[str, str]] = [{}, {}, {}, {}]
+        for file_path in all_files:
+            named = module_path(file_path)
+            if named is None:
+                continue
+            stem, is_pyw = named
+            self.indexes[is_pyw][stem] = file_path
+            package, _, name = stem.rpartition("/")
+            if name == PACKAGE_INIT and package:
+                self.indexes[2 + is_pyw][package] = file_path
+        self._directories: Dict[str, str] = {}  # importing directory -> its normalized form
+        self._memo: Dict[Tuple[str, str], Optional[str]] = {}
+
+    def _directory(self, directory: str) -> str:
+        normalized = self._directories.get(directory)
+        if normalized is None:
+            normalized = self._directories[directory] = normalize_path(directory).strip("/")
+        return normalized
+
+    def resolve(self, module_name: str, parent_file: Optional[str] = None) -> Optional[str]:
+        """The file (as stored) defining module_name, or None if it isn't an analyzed file."""
+        directory = os.path.dirname(parent_file) if parent_file else ""
+        key = (module_name, directory)
+        try:
+            return self._memo[key]
+        except KeyError:
+            pass
+        name = module_name.lower().replace(".", "/")
+        directory = self._directory(directory) if directory else ""
+        relative = f"{directory}/{name}" if directory else None
+        target = None
+        for index in self.indexes:
+            target = index.get(name)
+            if target is None and relative is not None:
+                target = index.get(relative)
+            if target is not None:
+                break
+        self._memo[key] = target
+        return target
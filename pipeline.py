@@ -0,0 +1,178 @@
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from analysis_cache import AnalysisCache
+from analyzer import AnalyzeError, analyze_file, analyze_source
+
+DEFAULT_READ_WORKERS = 4
+DEFAULT_CHUNKSIZE = 32  # when the number of files isn't known up front
+
+def _read(file_path: str) -> Tuple[Optional[bytes], Optional[Exception]]:
+    """Raw content of a file, or the AnalyzeError analyze_file() would raise for it."""
+    try:
+        with open(file_path, 'rb') as f:
+            return f.read(), None
+    except FileNotFoundError:
+        return None, AnalyzeError(f"Error analyzing {file_path}: File not found: {file_path}")
+    except OSError as e:
+        return None, AnalyzeError(f"Error analyzing {file_path}: {e}")
+
+def _parse_batch(items: List[Tuple[str, Optional[bytes], Optional[Exception]]],
+                 imports_only: bool) -> List[Tuple[str, Optional[Dict[str, Any]], Optional[Exception]]]:
+    """
+    Process-pool entry point: analyze a batch of read files, handing back (file, result,
+    error) instead of raising, so a single bad file doesn't take down its whole batch.
+    Files read without error but with no data (unchanged since they were cached) are
+    skipped, giving (file, None, None).
+    """
+    results = []
+    for file_path, data, error in items:
+        if error is None and data is not None:
+            try:
+                results.append((file_path, analyze_source(data, file_path, imports_only=imports_only), None))
+                continue
+            except Exception as e:
+                error = e
+        results.append((file_path, None, error))
+    return results
+
+class _Batch:
+    """Cache misses that are read, then parsed, together (not necessarily consecutive files)."""
+    __slots__ = ("files", "expected", "future", "parsed", "digests", "results")
+
+    def __init__(self):
+        self.files: List[str] = []
+        self.expected: List[Optional[str]] = []  # content hash of each file's cache entry
+        self.future: Optional[Future] = None  # the read
+        self.parsed: Optional[Future] = None  # the parse, on a worker process
+        self.digests: Optional[List[Optional[str]]] = None  # content hash of each file as read
+        self.results: Optional[List[Tuple[str, Optional[Dict[str, Any]], Optional[Exception]]]] = None
+
+def analyze_pipeline(py_files: Iterable[str], workers: Optional[int] = 1, chunksize: Optional[int] = None,
+                     cache=None, imports_only: bool = False, stats: Optional[Dict[str, os.stat_result]] = None,
+                     read_workers: int = DEFAULT_READ_WORKERS,
+                     max_pending: Optional[int] = None) -> Iterator[Tuple[str, Optional[Dict[str, Any]], Optional[Exception]]]:
+    """
+    Yield (file, analysis_result, error) for every file, in the same order as py_files.
+
+    Runs as a pipeline of bounded stages: py_files is pulled lazily (so it can be a
+    discovery stream such as file_discovery.iter_py_files), files missing from the cache
+    are read in batches of chunksize on read_workers threads, parsed on a pool of workers
+    processes (1 = in this process, None = os.cpu_count()) and handed back to the caller,
+    the single consumer writing them to the store, in input order. Reads and parses run
+    ahead of the caller by at most max_pending files, so disk latency overlaps with
+    parsing while memory use stays bounded however large the codebase is. Read batches
+    are handed to the worker processes from the caller's thread, which also starts the
+    processes before any reader or discovery thread runs, as forking a multi-threaded
+    process can deadlock the child. Cache hits (see
+    worker.analyze_files for cache and stats) are neither read nor parsed: the main loop
+    only compares mtimes and sizes, while content hashes are taken by the reader threads
+    from the bytes they read anyway, and files whose content still matches their cache
+    entry are not parsed either.
+    """
+    sized = hasattr(py_files, "__len__")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if sized:
+        workers = min(workers, len(py_files))
+    if chunksize is None:
+        chunksize = max(1, min(256, len(py_files) // (max(workers, 1) * 4))) if sized else DEFAULT_CHUNKSIZE
+    if max_pending is None:
+        max_pending = chunksize * (max(workers, 1) + read_workers) * 2
+    readers = ThreadPoolExecutor(max_workers=read_workers)
+    parsers = None
+    if workers > 1:
+        parsers = ProcessPoolExecutor(max_workers=workers)
+        # With fork, the first task starts every worker: do it before any reader or discovery thread runs
+        parsers.submit(os.getpid)
+
+    def read_batch(files: List[str], expected: List[Optional[str]]):
+        items = []
+        digests = []
+        for file_path, expected_hash in zip(files, expected):
+            data, error = _read(file_path)
+            digest = AnalysisCache.hash_content(data) if cache is not None and data is not None else None
+            if digest is not None and digest == expected_hash:
+                data = None  # touched but not modified: the cached analysis is reused
+            items.append((file_path, data, error))
+            digests.append(digest)
+        return digests, items
+
+    reading: Dict[_Batch, None] = {}  # batches whose read isn't handed to the parsers yet
+
+    def start_parses():
+        for batch in [batch for batch in reading if batch.future.done()]:
+            del reading[batch]
+            batch.digests, items = batch.future.result()
+            batch.parsed = parsers.submit(_parse_batch, items, imports_only)
+
+    def submit(batch: _Batch):
+        batch.future = readers.submit(read_batch, batch.files, batch.expected)
+        if parsers is not None:
+            reading[batch] = None
+            start_parses()
+
+    queue = deque()  # (file, cached result) and (batch, position) entries, in input order
+    filling: Optional[_Batch] = None
+
+    def pop():
+        nonlocal filling
+        entry, position = queue.popleft()
+        if not isinstance(entry, _Batch):
+            return entry, position, None
+        if entry.results is None:
+            if entry.future is None:
+                submit(entry)
+                filling = None
+            if parsers is None:
+                entry.digests, items = entry.future.result()
+                entry.results = _parse_batch(items, imports_only)
+            else:
+                while entry.parsed is None:
+                    # Hand every read finishing meanwhile to the parsers, not just this one
+                    wait([batch.future for batch in reading], return_when=FIRST_COMPLETED)
+                    start_parses()
+                entry.results = entry.parsed.result()
+        file_path, result, error = entry.results[position]
+        if cache is not None:
+            # Settle the hit or miss with the hash taken while reading; a miss is recorded for put()
+            cached = cache.get(file_path, stats.get(file_path) if stats is not None else None,
+                               entry.digests[position])
+            if cached is not None:
+                return file_path, cached, None
+            if error is None and result is None:
+                # Skipped as unchanged, but its entry turned out unusable: analyze it after all
+                try:
+                    result = analyze_file(file_path, imports_only=imports_only)
+                except Exception as e:
+                    error = e
+            if error is None:
+                cache.put(file_path, result)
+        return file_path, result, error
+
+    try:
+        for file_path in py_files:
+            result = None
+            if cache is not None:
+                result = cache.get_unchanged(file_path, stats.get(file_path) if stats is not None else None)
+            if result is not None:
+                queue.append((file_path, result))
+            else:
+                if filling is None:
+                    filling = _Batch()
+                queue.append((filling, len(filling.files)))
+                filling.files.append(file_path)
+                filling.expected.append(cache.expected_hash(file_path) if cache is not None else None)
+                if len(filling.files) >= chunksize:
+                    submit(filling)
+                    filling = None
+            while len(queue) >= max_pending:
+                yield pop()
+        while queue:
+            yield pop()
+    finally:
+        # Let running reads finish before the parsers go away
+        readers.shutdown(cancel_futures=True)
+        if parsers is not None:
+            parsers.shutdown(cancel_futures=True)
@@ -0,0 +1,140 @@
+import json
+import sys
+import time
+from typing import IO, Any, Dict, Optional, Union
+from analyzer import format_io_operation
+
+# Verbosity levels of dependency_store_maker / dependency_store_updater output
+QUIET = 0  # nothing on the console
+NORMAL = 1  # errors, the summary and where the store was saved
+VERBOSE = 2  # also a line per analyzed file
+DEBUG = 3  # also each file's imports, I/O operations and function usage
+
+def format_file_analysis(dependencies: Dict[str, Any]) -> str:
+    """The per-file analysis details, as printed at DEBUG verbosity."""
+    lines = ["Dependencies found:",
+             f"Imports: {dependencies['imports']}",
+             f"I/O Operations: {dependencies['io_call_count']}"]
+    if 'file_info' in dependencies:
+        file_info = dependencies['file_info']
+        lines.append(f"File Info: {file_info.get('lines', 'unknown')} lines, {file_info.get('size', 'unknown')} bytes")
+    if dependencies.get('io_operations'):
+        lines.append("I/O Operations Details:")
+        lines.extend(f"  - {format_io_operation(op)}" for op in dependencies['io_operations'])
+    lines.append("\nFunction/Class Usage:")
+    has_functions = False
+    for module, functions in dependencies['function_usage'].items():
+        if functions:
+            has_functions = True
+            lines.append(f"  {module}:")
+            lines.extend(f"    - {func}" for func in sorted(functions))
+    if not has_functions:
+        lines.append("  NONE")
+    return "\n".join(lines)
+
+class ProgressReporter:
+    """
+    Progress output of a store build or update.
+
+    Console lines go to stream (sys.stdout at the time of writing by default) up to the
+    given verbosity; nothing is formatted for levels that aren't shown, so the default
+    NORMAL level costs nothing per file. With json_stream (a path or an open text file),
+    every event is also written there as one JSON object per line and flushed right
+    away, for CI jobs or other tools to follow:
+    {"event": "file", "path": ..., "status": "ok", "imports": 3, "io_operations": 0, "lines": 120},
+    {"event": "file", "path": ..., "status": "error", "error": ...}, "cache", "summary" and
+    "saved" events. Use as a context manager, or close(), to close a json_stream opened
+    from a path.
+    """
+
+    def __init__(self, verbosity: int = NORMAL, stream: Optional[IO[str]] = None,
+                 json_stream: Union[str, IO[str], None] = None):
+        self.verbosity = verbosity
+        self.stream = stream
+        self._owns_json = isinstance(json_stream, str)
+        self.json_stream = open(json_stream, 'w', encoding='utf-8') if self._owns_json else json_stream
+        self.files = 0
+        self.errors = 0
+        self._started = time.perf_counter()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._owns_json and self.json_stream is not None:
+            self.json_stream.close()
+            self.json_stream = None
+
+    def _print(self, text: str):
+        print(text, file=self.stream if self.stream is not None else sys.stdout)
+
+    def event(self, event: str, **fields):
+        """Write one event to the JSON-lines stream, if there is one."""
+        if self.json_stream is not None:
+            self.json_stream.write(json.dumps({"event": event, **fields}) + "\n")
+            self.json_stream.flush()
+
+    def message(self, text: str, level: int = NORMAL):
+        if self.verbosity >= level:
+            self._print(text)
+
+    def file_analyzed(self, file: str, rel_path: str, dependencies: Dict[str, Any]):
+        self.files += 1
+        if self.verbosity >= VERBOSE:
+            self._print(f"\nAnalyzing file: {file}")
+            if self.verbosity >= DEBUG:
+                self._print(format_file_analysis(dependencies))
+        if self.json_stream is not None:
+            self.event("file", path=rel_path, status="ok", imports=len(dependencies['imports']),
+                       io_operations=dependencies['io_call_count'],
+                       lines=dependencies.get('file_info', {}).get('lines'))
+
+    def file_failed(self, file: str, rel_path: str, error: Exception):
+        self.errors += 1
+        if self.verbosity >= VERBOSE:
+            self._print(f"\nAnalyzing file: {file}")
+        if self.verbosity >= NORMAL:
+            self._print(f"Error analyzing {file}: {error}")
+        self.event("file", path=rel_path, status="error", error=str(error))
+
+    def cache_stats(self, shard: Optional[str], cache):
+        self.message(f"\nAnalysis cache{'' if shard is None else f' ({shard})'}: "
+                     f"{cache.hits} reused, {cache.misses} re-analyzed")
+        self.event("cache", shard=shard, hits=cache.hits, misses=cache.misses)
+
+    def summary(self, store):
+        """The summary totals and top-5 lists of a built store."""
+        summary = store.get_summary()
+        self.event("summary", files=self.files, errors=self.errors,
+                   elapsed=round(time.perf_counter() - self._started, 3),
+                   **{key: summary[key] for key in ('total_files', 'total_imports', 'total_io_operations',
+                                                    'total_lines', 'empty_files')})
+        if self.verbosity < NORMAL:
+            return
+        self._print(f"\n{'='*50}")
+        self._print("ANALYSIS SUMMARY")
+        self._print(f"{'='*50}")
+        self._print(f"Total files analyzed: {summary['total_files']}")
+        self._print(f"Total imports found: {summary['total_imports']}")
+        self._print(f"Total I/O operations: {summary['total_io_operations']}")
+        self._print(f"Total lines of code: {summary['total_lines']}")
+        self._print(f"Empty files: {summary['empty_files']}")
+
+        self._print(f"\nTop 5 largest files:")
+        for file_path, lines in store.get_largest_files(5):
+            self._print(f"  {file_path}: {lines} lines")
+
+        self._print(f"\nTop 5 most imported modules:")
+        for module, count in store.get_most_imported_modules(5):
+            self._print(f"  {module}: imported by {count} files")
+
+        self._print(f"\nTop 5 files with most I/O operations:")
+        for file_path, count in store.get_files_by_io_count(5):
+            self._print(f"  {file_path}: {count} I/O operations")
+
+    def saved(self, output_path, text: Optional[str] = None):
+        self.message(text if text is not None else f"\nDependencies saved to: {output_path}")
+        self.event("saved", path=str(output_path))
@@ -0,0 +1,81 @@
+import heapq
+from itertools import islice
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+
+class Ranking:
+    """
+    Keys ranked by score (highest first), kept up to date as scores change.
+
+    Backed by a heap with lazy deletion: changing or removing a key leaves its old heap
+    entry behind, to be skipped when met and purged when the heap grows too stale. Score
+    changes are queued and pushed on the next query, so a key updated many times between
+    queries costs one push. Ties are broken by a
+    sequence number (first-set order unless the caller passes its own), matching a stable
+    sort of the keys in insertion order. A top-k query costs O((offset + k) log n) plus
+    O(log n) per key changed since the last query.
+    """
+    __slots__ = ("entries", "heap", "pending", "next_seq")
+
+    def __init__(self):
+        self.entries: Dict[Hashable, Tuple[int, int]] = {}  # key -> (score, seq)
+        self.heap: List[Tuple[int, int, Hashable]] = []  # (-score, seq, key), possibly stale
+        self.pending: Set[Hashable] = set()  # keys whose current entry isn't in the heap yet
+        self.next_seq = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def seq(self, key: Hashable) -> Optional[int]:
+        entry = self.entries.get(key)
+        return entry[1] if entry is not None else None
+
+    def set(self, key: Hashable, score: int, seq: Optional[int] = None) -> int:
+        """Set key's score, keeping its place among equal scores; returns its seq."""
+        entries = self.entries
+        if seq is None:
+            entry = entries.get(key)
+            if entry is not None:
+                seq = entry[1]
+            else:
+                seq = self.next_seq
+                self.next_seq += 1
+        elif seq >= self.next_seq:
+            self.next_seq = seq + 1
+        entries[key] = (score, seq)
+        self.pending.add(key)
+        return seq
+
+    def discard(self, key: Hashable):
+        if self.entries.pop(key, None) is not None:
+            self.pending.discard(key)
+
+    def _flush(self):
+        """Push queued changes, first dropping stale heap entries if they outnumber live ones."""
+        entries, heap = self.entries, self.heap
+        if len(heap) + len(self.pending) > 2 * len(entries) + 64:
+            self.heap = [(-score, seq, key) for key, (score, seq) in entries.items()]
+            heapq.heapify(self.heap)
+        else:
+            for key in self.pending:
+                score, seq = entries[key]
+                heapq.heappush(heap, (-score, seq, key))
+        self.pending.clear()
+
+    def top(self, limit: Optional[int] = 10, offset: int = 0) -> List[Tuple[Hashable, int]]:
+        """(key, score) pairs ranked offset to offset + limit (limit None = all the rest)."""
+        if limit is None or offset + limit >= len(self.entries):
+            ranked = sorted(self.entries.items(), key=lambda item: (-item[1][0], item[1][1]))
+            return [(key, score) for key, (score, _) in islice(ranked, offset, None if limit is None else offset + limit)]
+        if self.pending:
+            self._flush()
+        heap, entries = self.heap, self.entries
+        popped, seen = [], set()
+        while len(popped) < offset + limit:
+            neg_score, seq, key = heapq.heappop(heap)
+            # a score changed and then changed back leaves two live-looking copies
+            if entries.get(key) == (-neg_score, seq) and key not in seen:
+                seen.add(key)
+                popped.append((neg_score, seq, key))
+        for item in popped:
+            heapq.heappush(heap, item)
+        return [(key, -neg_score) for neg_score, _, key in popped[offset:]]
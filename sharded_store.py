@@ -0,0 +1,255 @@
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Set
+from analyzer import IOOperation
+from dependency_graph import DependencyGraph, GraphQueries
+from dependency_store import DependencyStore
+from module_resolver import ModuleResolver
+
+MANIFEST_VERSION = 2
+# Shard of files directly in the codebase root; no top-level directory can have this name
+ROOT_SHARD = "."
+LEGACY_ROOT_SHARD = "_root"  # its name in version 1 manifests, where it shared a real _root/ package's shard
+
+def shard_name(file_path: str) -> str:
+    """Shard a (normalized, relative) file path belongs to: its top-level directory."""
+    top, sep, _ = file_path.partition("/")
+    return top if sep else ROOT_SHARD
+
+class ShardedDependencyStore(GraphQueries):
+    """
+    Dependency store split into one DependencyStore per top-level directory of the codebase.
+
+    Saved as a directory holding a small manifest.json (shard names, file counts and
+    summaries) and one dependencies JSON per shard. Shards are loaded on first use, and
+    save() only rewrites shards that changed since they were loaded or last saved, so
+    re-analyzing one package rewrites one shard. Queries fan out across shards.
+    """
+
+    def __init__(self, output_dir: str = "output_files"):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(exist_ok=True)
+        self.shards: Dict[str, Optional[DependencyStore]] = {}  # name -> store, None until loaded
+        self.manifest: Dict[str, Dict[str, Any]] = {}  # name -> {"file", "files", "summary"} as last saved
+        self.dirty: Set[str] = set()
+        self.shard_dir: Optional[Path] = None
+        self._graph: Optional[DependencyGraph] = None  # across all shards; dropped on any change
+        self._resolver: Optional[ModuleResolver] = None  # likewise
+
+    @staticmethod
+    def _shard_filename(name: str) -> str:
+        return f"shard_{name}.json"
+
+    def _store_dir(self, filename: str) -> Path:
+        """Directory a sharded store is saved in: the JSON filename without its suffix."""
+        return self.output_dir / Path(filename).stem
+
+    def shard(self, name: str, create: bool = False) -> Optional[DependencyStore]:
+        """The named shard, loading it if needed (or creating it when create is set)."""
+        if name not in self.shards:
+            if not create:
+                return None
+            self.shards[name] = DependencyStore(self.output_dir)
+            self._changed(name)
+        store = self.shards[name]
+        if store is None:
+            store = self.shards[name] = DependencyStore(self.shard_dir)
+            store.load(self.manifest[name]["file"])
+        return store
+
+    def _changed(self, name: str):
+        self.dirty.add(name)
+        self._graph = self._resolver = None
+
+    def iter_shards(self) -> Iterator[DependencyStore]:
+        for name in list(self.shards):
+            yield self.shard(name)
+
+    def set_shard(self, name: str, store: DependencyStore):
+        """Replace a whole shard, e.g. with a freshly analyzed package."""
+        self.shards[name] = store
+        self._changed(name)
+
+    def drop_shard(self, name: str) -> bool:
+        """Remove a shard, e.g. for a package that no longer exists."""
+        if name not in self.shards:
+            return False
+        del self.shards[name]
+        self._changed(name)
+        return True
+
+    def add_file_dependencies(self, file_path: str, analysis_result):
+        """Add dependencies for a single file to its shard, replacing any previous entry."""
+        name = shard_name(file_path)
+        self.shard(name, create=True).add_file_dependencies(file_path, analysis_result)
+        self._changed(name)
+
+    def remove_file_dependencies(self, file_path: str) -> bool:
+        name = shard_name(file_path)
+        store = self.shard(name)
+        if store is None or not store.remove_file_dependencies(file_path):
+            return False
+        self._changed(name)
+        return True
+
+    def update_files(self, updated: Dict[str, Dict[str, Any]], deleted=()) -> Dict[str, int]:
+        """Incrementally apply changes; only the shards of the given files are touched."""
+        counts = {"added": 0, "replaced": 0, "removed": 0}
+        for file_path in deleted:
+            if self.remove_file_dependencies(file_path):
+                counts["removed"] += 1
+        for file_path, analysis_result in updated.items():
+            store = self.shard(shard_name(file_path))
+            counts["replaced" if store is not None and file_path in store.records else "added"] += 1
+            self.add_file_dependencies(file_path, analysis_result)
+        return counts
+
+    def save(self, filename: str = "dependencies.json", **save_options):
+        """
+        Save to a directory named after filename (e.g. dependencies_x/), writing only changed
+        shards plus the manifest. save_options are passed to DependencyStore.save().
+        """
+        shard_dir = self._store_dir(filename)
+        shard_dir.mkdir(exist_ok=True)
+        moved = shard_dir != self.shard_dir
+        for name in list(self.shards):
+            store = self.shards[name]
+            if name not in self.dirty and not moved:
+                continue
+            store = self.shard(name)
+            if not store.records:
+                # Emptied by removals: drop it rather than keep an empty shard around
+                del self.shards[name]
+                continue
+            store.output_dir = shard_dir
+            previous = self.manifest.get(name, {}).get("file")
+            output_path = store.save(self._shard_filename(name), **save_options)
+            if previous is not None and previous != output_path.name and (shard_dir / previous).exists():
+                os.remove(shard_dir / previous)  # saved under another name before (renamed or recompressed)
+            self.manifest[name] = {"file": output_path.name, "files": len(store.records),
+                                   "summary": dict(store.get_summary())}
+        for name in [name for name in self.manifest if name not in self.shards]:
+            stale = shard_dir / self.manifest.pop(name)["file"]
+            if stale.exists():
+                os.remove(stale)
+        manifest_path = shard_dir / "manifest.json"
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": MANIFEST_VERSION, "shards": self.manifest}, f, indent=2)
+        self.shard_dir = shard_dir
+        self.dirty.clear()
+        return manifest_path
+
+    def load(self, filename: str = "dependencies.json") -> bool:
+        """Read the manifest saved for filename; shards themselves are loaded on first use."""
+        shard_dir = self._store_dir(filename)
+        manifest_path = shard_dir / "manifest.json"
+        if not manifest_path.exists():
+            return False
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.manifest = data.get("shards", {})
+        if data.get("version", 1) < 2 and LEGACY_ROOT_SHARD in self.manifest:
+            self.manifest[ROOT_SHARD] = self.manifest.pop(LEGACY_ROOT_SHARD)
+        self.shards = dict.fromkeys(self.manifest)
+        self.dirty = set()
+        self.shard_dir = shard_dir
+        self._graph = self._resolver = None
+        return True
+
+    def shard_names(self) -> List[str]:
+        return list(self.shards)
+
+    def get_file_dependencies(self, file_path: str) -> Dict[str, Any]:
+        store = self.shard(shard_name(file_path))
+        return store.get_file_dependencies(file_path) if store is not None else {}
+
+    def get_file_io_operations(self, file_path: str) -> List[IOOperation]:
+        store = self.shard(shard_name(file_path))
+        return store.get_file_io_operations(file_path) if store is not None else []
+
+    def get_file_info(self, file_path: str) -> Dict[str, Any]:
+        store = self.shard(shard_name(file_path))
+        return store.get_file_info(file_path) if store is not None else {}
+
+    def _concat(self, method: str, *args) -> List[Any]:
+        return [item for store in self.iter_shards() for item in getattr(store, method)(*args)]
+
+    def get_module_dependents(self, module: str) -> List[str]:
+        return self._concat("get_module_dependents", module)
+
+    def get_all_files(self) -> List[str]:
+        return self._concat("get_all_files")
+
+    def get_files_with_io(self) -> List[str]:
+        return self._concat("get_files_with_io")
+
+    def get_files_by_io_operation(self, operation: str) -> List[str]:
+        return self._concat("get_files_by_io_operation", operation)
+
+    def get_files_by_io_category(self, category: str) -> List[str]:
+        return self._concat("get_files_by_io_category", category)
+
+    def iter_file_imports(self) -> Iterator[tuple]:
+        for store in self.iter_shards():
+            yield from store.iter_file_imports()
+
+    def get_files_using_function(self, module: str, function: str) -> List[str]:
+        return self._concat("get_files_using_function", module, function)
+
+    @staticmethod
+    def _add_counts(totals: Dict[str, int], counts: Iterable):
+        for key, count in counts:
+            totals[key] = totals.get(key, 0) + count
+        return totals
+
+    def get_io_categories(self) -> Dict[str, int]:
+        totals = {}
+        for store in self.iter_shards():
+            self._add_counts(totals, store.get_io_categories().items())
+        return totals
+
+    def get_summary(self) -> Dict[str, Any]:
+        """Sum of the shard summaries; shards that were never loaded use the manifest's copy."""
+        totals = dict.fromkeys(("total_files", "total_imports", "total_io_operations", "total_lines",
+                                "empty_files"), 0)
+        for name, store in self.shards.items():
+            summary = store.get_summary() if store is not None else self.manifest[name]["summary"]
+            self._add_counts(totals, summary.items())
+        return totals
+
+    @staticmethod
+    def _page(ranked: List[tuple], limit: Optional[int], offset: int) -> List[tuple]:
+        return ranked[offset:None if limit is None else offset + limit]
+
+    def _top(self, method: str, limit: Optional[int], offset: int) -> List[tuple]:
+        # Every item of the requested page is within the first offset + limit of its shard
+        per_shard = None if limit is None else offset + limit
+        ranked = sorted(self._concat(method, per_shard), key=lambda x: x[1], reverse=True)
+        return self._page(ranked, limit, offset)
+
+    def get_largest_files(self, limit: Optional[int] = 10, offset: int = 0) -> List[tuple]:
+        return self._top("get_largest_files", limit, offset)
+
+    def get_files_by_io_count(self, limit: Optional[int] = 10, offset: int = 0) -> List[tuple]:
+        return self._top("get_files_by_io_count", limit, offset)
+
+    def get_most_imported_modules(self, limit: Optional[int] = 10, offset: int = 0) -> List[tuple]:
+        # A module is imported from many shards, so its counts must be summed first
+        totals = {}
+        for store in self.iter_shards():
+            self._add_counts(totals, store.get_most_imported_modules(None))
+        return self._page(sorted(totals.items(), key=lambda x: x[1], reverse=True), limit, offset)
+
+    def get_all_dependencies(self) -> Dict[str, Any]:
+        """All shards combined in DependencyStore's JSON layout."""
+        combined = {"files": {}, "modules": {}, "io_operations": {}, "function_usage": {}, "file_info": {}}
+        for store in self.iter_shards():
+            for section, pairs in store.iter_sections():
+                if section == "modules":
+                    for module, files in pairs:
+                        combined["modules"].setdefault(module, []).extend(files)
+                elif section != "summary":
+                    combined[section].update(pairs)
+        combined["summary"] = self.get_summary()
+        return combined
@@ -0,0 +1,157 @@
+import json
+import mmap
+import os
+import struct
+from array import array
+from pathlib import Path
+from typing import Dict, List, Any, Tuple
+from file_analysis import FileAnalysis, SymbolTable
+
+# Layout: MAGIC, uint64 header length, JSON header, then 8-byte aligned columns. The
+# header maps each column name to [typecode, offset from the data start, item count].
+MAGIC = b"CFGSNAP\x01"
+_HEADER_LEN = struct.Struct("<Q")
+_NONE = 0xFFFFFFFF  # "no string" in string-ID columns
+
+# File flag bits
+_HAS_IO_DETAILS = 1
+_HAS_FILE_INFO = 2
+_EMPTY = 4
+
+class _StringTable:
+    """The store's SymbolTable names, followed by the other strings a snapshot needs."""
+
+    def __init__(self, symbols: SymbolTable):
+        self.strings = list(symbols.names)
+        self.ids = {}
+
+    def intern(self, value) -> int:
+        if value is None:
+            return _NONE
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = self.ids[value] = len(self.strings)
+            self.strings.append(value)
+        return string_id
+
+def write_snapshot(path: Path, symbols: SymbolTable, records: Dict[str, FileAnalysis],
+                   modules: Dict[int, Dict[str, None]], summary: Dict[str, Any]):
+    """Write a store's records, reverse index and summary as a columnar snapshot."""
+    strings = _StringTable(symbols)
+    file_index = {file_path: i for i, file_path in enumerate(records)}
+    columns = {name: array(typecode) for name, typecode in (
+        ("file_path", "I"), ("file_io_count", "I"), ("file_flags", "B"), ("file_size", "Q"),
+        ("file_lines", "Q"), ("file_info_path", "I"), ("file_info_extra", "I"),
+        ("imports_index", "Q"), ("imports", "I"), ("usage_index", "Q"), ("usage", "I"),
+        ("io_index", "Q"), ("io", "I"),
+        ("module_ids", "I"), ("dependents_index", "Q"), ("dependents", "I"),
+    )}
+    for name in ("imports_index", "usage_index", "io_index", "dependents_index"):
+        columns[name].append(0)
+
+    for file_path, record in records.items():
+        flags = (_HAS_IO_DETAILS if record.io_operations is not None else 0) | \
+                (_HAS_FILE_INFO if record.has_file_info else 0) | (_EMPTY if record.empty else 0)
+        columns["file_path"].append(strings.intern(file_path))
+        columns["file_io_count"].append(record.io_count)
+        columns["file_flags"].append(flags)
+        columns["file_size"].append(record.size or 0)
+        columns["file_lines"].append(record.lines)
+        columns["file_info_path"].append(strings.intern(record.path))
+        columns["file_info_extra"].append(strings.intern(json.dumps(record.info_extra) if record.info_extra else None))
+        for column, values in (("imports", record.imports), ("usage", record.function_usage),
+                               ("io", record.io_operations or ())):
+            columns[column].extend(values)
+            columns[column + "_index"].append(len(columns[column]))
+
+    for module_id, files in modules.items():
+        columns["module_ids"].append(module_id)
+        columns["dependents"].extend(file_index[file_path] for file_path in files)
+        columns["dependents_index"].append(len(columns["dependents"]))
+
+    string_data = bytearray()
+    string_index = array("Q", [0])
+    for value in strings.strings:
+        string_data += value.encode("utf-8")
+        string_index.append(len(string_data))
+    columns["string_index"] = string_index
+    columns["string_data"] = array("B", string_data)
+
+    layout = {}
+    offset = 0
+    for name, column in columns.items():
+        layout[name] = [column.typecode, offset, len(column)]
+        offset += -(-len(column) * column.itemsize // 8) * 8
+    header = json.dumps({"num_symbols": len(symbols), "summary": summary, "columns": layout}).encode("utf-8")
+    header += b" " * (-(len(MAGIC) + _HEADER_LEN.size + len(header)) % 8)
+
+    # Written aside and swapped in, so stores still mapping the old file keep a valid map
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC + _HEADER_LEN.pack(len(header)) + header)
+        for column in columns.values():
+            data = column.tobytes()
+            f.write(data + b"\0" * (-len(data) % 8))
+    os.replace(tmp_path, path)
+
+def read_snapshot(path: Path) -> Tuple[SymbolTable, Dict[str, FileAnalysis], Dict[int, Dict[str, None]],
+                                       Dict[str, Any], mmap.mmap]:
+    """
+    Open a snapshot written by write_snapshot().
+
+    The file is memory-mapped and each record's ID arrays are memoryview slices into the
+    map rather than copies. Returns (symbols, records, modules, summary, mapping); the
+    mapping must stay open as long as the records are in use.
+    """
+    with open(path, "rb") as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if data[:len(MAGIC)] != MAGIC:
+        data.close()
+        raise ValueError(f"{path} is not a dependency snapshot")
+    header_start = len(MAGIC) + _HEADER_LEN.size
+    header_len, = _HEADER_LEN.unpack_from(data, len(MAGIC))
+    header = json.loads(data[header_start:header_start + header_len])
+    base = header_start + header_len
+    view = memoryview(data)
+    columns = {}
+    for name, (typecode, offset, count) in header["columns"].items():
+        itemsize = array(typecode).itemsize
+        columns[name] = view[base + offset:base + offset + count * itemsize].cast(typecode)
+
+    string_data = bytes(columns["string_data"])
+    string_index = columns["string_index"]
+    strings: List[str] = [string_data[string_index[i]:string_index[i + 1]].decode("utf-8")
+                          for i in range(len(string_index) - 1)]
+    symbols = SymbolTable()
+    symbols.names = strings[:header["num_symbols"]]
+    symbols.ids = {name: symbol_id for symbol_id, name in enumerate(symbols.names)}
+
+    file_paths = [strings[string_id] for string_id in columns["file_path"]]
+    records = {}
+    imports, imports_index = columns["imports"], columns["imports_index"]
+    usage, usage_index = columns["usage"], columns["usage_index"]
+    io, io_index = columns["io"], columns["io_index"]
+    for i, file_path in enumerate(file_paths):
+        flags = columns["file_flags"][i]
+        record = FileAnalysis(
+            imports[imports_index[i]:imports_index[i + 1]],
+            columns["file_io_count"][i],
+            usage[usage_index[i]:usage_index[i + 1]],
+            io[io_index[i]:io_index[i + 1]] if flags & _HAS_IO_DETAILS else None,
+        )
+        if flags & _HAS_FILE_INFO:
+            info_path, info_extra = columns["file_info_path"][i], columns["file_info_extra"][i]
+            record.path = strings[info_path] if info_path != _NONE else None
+            record.size = columns["file_size"][i]
+            record.lines = columns["file_lines"][i]
+            record.empty = bool(flags & _EMPTY)
+            if info_extra != _NONE:
+                record.info_extra = tuple(tuple(item) for item in json.loads(strings[info_extra]))
+        records[file_path] = record
+
+    dependents, dependents_index = columns["dependents"], columns["dependents_index"]
+    modules = {
+        module_id: dict.fromkeys(file_paths[file] for file in dependents[dependents_index[i]:dependents_index[i + 1]])
+        for i, module_id in enumerate(columns["module_ids"])
+    }
+    return symbols, records, modules, header["summary"], data
@@ -0,0 +1,380 @@
+import json
+import sqlite3
+from itertools import groupby
+from operator import itemgetter
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Iterator, Tuple, Optional
+from analyzer import IOOperation
+from dependency_graph import DependencyGraph, GraphQueries
+from file_analysis import parse_io_operation
+from json_stream import open_json, with_compression, write_sections
+from module_resolver import ModuleResolver
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    io_count INTEGER NOT NULL,
+    has_io_details INTEGER NOT NULL  -- 0 when the analysis had no I/O details (imports-only)
+);
+CREATE INDEX IF NOT EXISTS files_io_count ON files (io_count);
+
+CREATE TABLE IF NOT EXISTS imports (
+    id INTEGER PRIMARY KEY,  -- insertion order, which dependents are listed in
+    file_id INTEGER NOT NULL,
+    module TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS imports_module ON imports (module);
+CREATE INDEX IF NOT EXISTS imports_file ON imports (file_id);
+
+CREATE TABLE IF NOT EXISTS function_usage (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL,
+    module TEXT NOT NULL,
+    symbol TEXT  -- NULL for a module none of whose names are used
+);
+CREATE INDEX IF NOT EXISTS function_usage_file ON function_usage (file_id);
+CREATE INDEX IF NOT EXISTS function_usage_symbol ON function_usage (module, symbol);
+
+CREATE TABLE IF NOT EXISTS io_operations (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL,
+    operation TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    col INTEGER NOT NULL,
+    category TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS io_operations_file ON io_operations (file_id);
+CREATE INDEX IF NOT EXISTS io_operations_operation ON io_operations (operation);
+CREATE INDEX IF NOT EXISTS io_operations_category ON io_operations (category);
+
+CREATE TABLE IF NOT EXISTS file_info (
+    file_id INTEGER PRIMARY KEY,
+    path TEXT,
+    size INTEGER NOT NULL,
+    lines INTEGER NOT NULL,
+    empty INTEGER NOT NULL,
+    extra TEXT  -- JSON object of any other file_info items, e.g. {"imports_only": true}
+);
+CREATE INDEX IF NOT EXISTS file_info_lines ON file_info (lines);
+"""
+
+_CHILD_TABLES = ("imports", "function_usage", "io_operations", "file_info")
+
+class SQLiteDependencyStore(GraphQueries):
+    """
+    DependencyStore backend kept in an SQLite database instead of memory.
+
+    Exposes the same add/update/get_* API as DependencyStore, with each query answered
+    by indexed SQL, so repos too large to hold in memory can still be analyzed and
+    queried. Writes are grouped into transactions of batch_size files; save() commits.
+    The database is opened on first use. Without a filename, dependency_store_maker and
+    dependency_store_updater name it after the codebase (dependencies_<codebase>.sqlite,
+    see use_codebase()), so codebases sharing an output_dir don't share a database;
+    otherwise it is dependencies.sqlite.
+    """
+
+    def __init__(self, output_dir: str = "output_files", filename: Optional[str] = None,
+                 batch_size: int = 1000):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(exist_ok=True)
+        self.filename = filename
+        self.batch_size = batch_size
+        self._pending = 0  # files written since the last commit
+        self._graph: Optional[DependencyGraph] = None  # built on demand, dropped on any write
+        self._resolver: Optional[ModuleResolver] = None  # likewise
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def db_path(self) -> Path:
+        return self.output_dir / (self.filename or "dependencies.sqlite")
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(str(self.db_path))
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def use_codebase(self, codebase_name: str):
+        """Name the database after a codebase, unless a filename was given or it is already open."""
+        if self.filename is None and self._conn is None:
+            self.filename = f"dependencies_{codebase_name}.sqlite"
+
+    def clear(self):
+        """Delete every file, e.g. before a full rebuild into an existing database."""
+        for table in ("files",) + _CHILD_TABLES:
+            self.conn.execute(f"DELETE FROM {table}")
+        self.conn.commit()
+        self._graph = self._resolver = None
+        self._pending = 0
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.commit()
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _wrote(self, num_files: int = 1):
+        self._graph = self._resolver = None
+        self._pending += num_files
+        if self._pending >= self.batch_size:
+            self.conn.commit()
+            self._pending = 0
+
+    def _file_id(self, file_path: str) -> Optional[int]:
+        row = self.conn.execute("SELECT id FROM files WHERE path = ?", (file_path,)).fetchone()
+        return row[0] if row is not None else None
+
+    def _delete_children(self, file_id: int):
+        for table in _CHILD_TABLES:
+            self.conn.execute(f"DELETE FROM {table} WHERE file_id = ?", (file_id,))
+
+    def _insert(self, file_path: str, analysis_result: Dict[str, Any]):
+        """Write one analyze_file() result, replacing any previous entry for the file."""
+        execute = self.conn.execute
+        io_operations = analysis_result.get("io_operations")
+        row = (analysis_result["io_call_count"], io_operations is not None)
+        file_id = self._file_id(file_path)
+        if file_id is None:
+            file_id = execute("INSERT INTO files (path, io_count, has_io_details) VALUES (?, ?, ?)",
+                              (file_path,) + row).lastrowid
+        else:
+            # Keep the file's id (and so its position in file listings), like DependencyStore
+            execute("UPDATE files SET io_count = ?, has_io_details = ? WHERE id = ?", row + (file_id,))
+            self._delete_children(file_id)
+
+        self.conn.executemany("INSERT INTO imports (file_id, module) VALUES (?, ?)",
+                              [(file_id, module) for module in analysis_result["imports"]])
+        self.conn.executemany("INSERT INTO function_usage (file_id, module, symbol) VALUES (?, ?, ?)",
+                              [(file_id, module, symbol)
+                               for module, functions in analysis_result["function_usage"].items()
+                               for symbol in (sorted(functions) or [None])])
+        if io_operations:
+            self.conn.executemany(
+                "INSERT INTO io_operations (file_id, operation, line, col, category) VALUES (?, ?, ?, ?, ?)",
+                [(file_id,) + tuple(parse_io_operation(op)) for op in io_operations])
+        file_info = analysis_result.get("file_info")
+        if file_info is not None:
+            extra = {k: v for k, v in file_info.items() if k not in ("path", "size", "lines", "empty")}
+            execute("INSERT INTO file_info (file_id, path, size, lines, empty, extra) VALUES (?, ?, ?, ?, ?, ?)",
+                    (file_id, file_info.get("path"), file_info.get("size", 0), file_info.get("lines", 0),
+                     bool(file_info.get("empty", False)), json.dumps(extra) if extra else None))
+
+    def add_file_dependencies(self, file_path: str, analysis_result: Dict[str, Any]):
+        """Add dependencies for a single file to the store, replacing any previous entry."""
+        self._insert(file_path, analysis_result)
+        self._wrote()
+
+    def add_files(self, items: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        """Bulk-add (file_path, analysis_result) pairs, committing every batch_size files."""
+        count = 0
+        for file_path, analysis_result in items:
+            self._insert(file_path, analysis_result)
+            self._wrote()
+            count += 1
+        return count
+
+    def remove_file_dependencies(self, file_path: str) -> bool:
+        """Remove a single file and everything recorded for it."""
+        file_id = self._file_id(file_path)
+        if file_id is None:
+            return False
+        self._delete_children(file_id)
+        self.conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+        self._wrote()
+        return True
+
+    def update_files(self, updated: Dict[str, Dict[str, Any]], deleted=()) -> Dict[str, int]:
+        """Incrementally apply changes to the store (see DependencyStore.update_files)."""
+        counts = {"added": 0, "replaced": 0, "removed": 0}
+        for file_path in deleted:
+            if self.remove_file_dependencies(file_path):
+                counts["removed"] += 1
+        for file_path, analysis_result in updated.items():
+            counts["replaced" if self._file_id(file_path) is not None else "added"] += 1
+            self.add_file_dependencies(file_path, analysis_result)
+        return counts
+
+    def save(self, filename: Optional[str] = None, compact: bool = False, compression: Optional[str] = None):
+        """
+        Commit pending writes. With a filename, also export the store as dependencies JSON,
+        streamed like DependencyStore.save (same compact and compression options).
+        """
+        self.conn.commit()
+        self._pending = 0
+        if filename is None:
+            return self.db_path
+        output_path = with_compression(self.output_dir / filename, compression)
+        with open_json(output_path, 'w') as f:
+            write_sections(f, self.iter_sections(), compact=compact)
+        return output_path
+
+    def load(self, filename: str = "dependencies.json") -> bool:
+        """Import a dependencies JSON saved by DependencyStore into the database."""
+        input_path = self.output_dir / filename
+        if not input_path.exists():
+            return False
+        with open_json(input_path) as f:
+            data = json.load(f)
+        io_operations = data.get("io_operations", {})
+        file_info = data.get("file_info", {})
+        self.add_files((file_path, {
+            "imports": file_entry.get("imports", []),
+            "io_call_count": file_entry.get("io_count", 0),
+            "function_usage": file_entry.get("function_usage", {}),
+            "io_operations": io_operations.get(file_path),
+            "file_info": file_info.get(file_path),
+        }) for file_path, file_entry in data.get("files", {}).items())
+        self.save()
+        return True
+
+    def get_file_dependencies(self, file_path: str) -> Dict[str, Any]:
+        """Get dependencies for a specific file."""
+        row = self.conn.execute("SELECT id, io_count FROM files WHERE path = ?", (file_path,)).fetchone()
+        return self._file_entry(*row) if row is not None else {}
+
+    def _file_entry(self, file_id: int, io_count: int) -> Dict[str, Any]:
+        function_usage = {}
+        for module, symbol in self.conn.execute(
+                "SELECT module, symbol FROM function_usage WHERE file_id = ? ORDER BY id", (file_id,)):
+            symbols = function_usage.setdefault(module, [])
+            if symbol is not None:
+                symbols.append(symbol)
+        return {
+            "imports": [module for module, in self.conn.execute(
+                "SELECT module FROM imports WHERE file_id = ? ORDER BY id", (file_id,))],
+            "io_count": io_count,
+            "function_usage": function_usage,
+        }
+
+    def get_file_io_operations(self, file_path: str) -> List[IOOperation]:
+        """Get I/O operations for a specific file, as IOOperation records."""
+        return [IOOperation(*row) for row in self.conn.execute(
+            "SELECT operation, line, col, category FROM io_operations "
+            "WHERE file_id = (SELECT id FROM files WHERE path = ?) ORDER BY id", (file_path,))]
+
+    def get_file_info(self, file_path: str) -> Dict[str, Any]:
+        """Get file information for a specific file."""
+        row = self.conn.execute(
+            "SELECT file_info.path, size, lines, empty, extra FROM file_info "
+            "JOIN files ON files.id = file_info.file_id WHERE files.path = ?", (file_path,)).fetchone()
+        return self._file_info(row) if row is not None else {}
+
+    @staticmethod
+    def _file_info(row) -> Dict[str, Any]:
+        path, size, lines, empty, extra = row
+        file_info = {"path": path, "size": size, "lines": lines, "empty": bool(empty)}
+        if extra:
+            file_info.update(json.loads(extra))
+        return file_info
+
+    def get_module_dependents(self, module: str) -> List[str]:
+        """Get all files that depend on a specific module."""
+        return [path for path, in self.conn.execute(
+            "SELECT files.path FROM imports JOIN files ON files.id = imports.file_id "
+            "WHERE imports.module = ? ORDER BY imports.id", (module,))]
+
+    def get_files_by_io_operation(self, operation: str) -> List[str]:
+        """Get all files that perform a given I/O operation (e.g. "json.load", "open()")."""
+        return self._files_with_io("operation", operation)
+
+    def get_files_by_io_category(self, category: str) -> List[str]:
+        """Get all files with I/O operations of a given category (e.g. "json", "database")."""
+        return self._files_with_io("category", category)
+
+    def iter_file_imports(self) -> Iterator[Tuple[str, List[str]]]:
+        """Yield (file, imported module names) for every file."""
+        rows = self.conn.execute(
+            "SELECT files.path, imports.module FROM files LEFT JOIN imports ON imports.file_id = files.id "
+            "ORDER BY files.id, imports.id")
+        for file_path, group in groupby(rows, key=itemgetter(0)):
+            yield file_path, [module for _, module in group if module is not None]
+
+    def get_files_using_function(self, module: str, function: str) -> List[str]:
+        """Get all files that use a given function or class of a module (e.g. "os.path", "join")."""
+        return [path for path, in self.conn.execute(
+            "SELECT path FROM files WHERE id IN (SELECT file_id FROM function_usage WHERE module = ? AND symbol = ?) "
+            "ORDER BY id", (module, function))]
+
+    def _files_with_io(self, column: str, value: str) -> List[str]:
+        return [path for path, in self.conn.execute(
+            f"SELECT path FROM files WHERE id IN (SELECT file_id FROM io_operations WHERE {column} = ?) "
+            "ORDER BY id", (value,))]
+
+    def get_io_categories(self) -> Dict[str, int]:
+        """Get each I/O category in use and the number of files using it."""
+        return dict(self.conn.execute(
+            "SELECT category, COUNT(DISTINCT file_id) FROM io_operations GROUP BY category ORDER BY MIN(id)"))
+
+    def get_all_dependencies(self) -> Dict[str, Any]:
+        """Get all stored dependencies, as plain dicts in DependencyStore's JSON layout."""
+        return {name: dict(pairs) for name, pairs in self.iter_sections()}
+
+    def iter_sections(self) -> Iterator[Tuple[str, Iterator[Tuple[str, Any]]]]:
+        """Yield the JSON layout's sections as (name, lazy (key, value) pairs), reading one file at a time."""
+        execute = self.conn.execute
+        yield "files", ((path, self._file_entry(file_id, io_count))
+                        for file_id, path, io_count in execute("SELECT id, path, io_count FROM files ORDER BY id"))
+        yield "modules", ((module, self.get_module_dependents(module)) for module, in execute(
+            "SELECT module FROM imports GROUP BY module ORDER BY MIN(id)"))
+        yield "io_operations", ((path, [IOOperation(*row)._asdict() for row in execute(
+            "SELECT operation, line, col, category FROM io_operations WHERE file_id = ? ORDER BY id", (file_id,))])
+            for file_id, path in execute("SELECT id, path FROM files WHERE has_io_details ORDER BY id"))
+        yield "function_usage", iter(())
+        yield "file_info", ((path, self._file_info(row)) for path, *row in execute(
+            "SELECT files.path, file_info.path, size, lines, empty, extra FROM file_info "
+            "JOIN files ON files.id = file_info.file_id ORDER BY file_id"))
+        yield "summary", iter(self.get_summary().items())
+
+    def get_summary(self) -> Dict[str, Any]:
+        """Get summary statistics, aggregated in SQL."""
+        execute = self.conn.execute
+        total_files, total_io = execute("SELECT COUNT(*), COALESCE(SUM(io_count), 0) FROM files").fetchone()
+        total_lines, empty_files = execute(
+            "SELECT COALESCE(SUM(lines), 0), COALESCE(SUM(empty), 0) FROM file_info").fetchone()
+        return {
+            "total_files": total_files,
+            "total_imports": execute("SELECT COUNT(*) FROM imports").fetchone()[0],
+            "total_io_operations": total_io,
+            "total_lines": total_lines,
+            "empty_files": empty_files
+        }
+
+    def get_all_files(self) -> List[str]:
+        """Get all file paths that have been analyzed."""
+        return [path for path, in self.conn.execute("SELECT path FROM files ORDER BY id")]
+
+    def get_files_with_io(self) -> List[str]:
+        """Get all files that have I/O operations."""
+        return [path for path, in self.conn.execute(
+            "SELECT path FROM files WHERE id IN (SELECT file_id FROM io_operations) ORDER BY id")]
+
+    @staticmethod
+    def _page(limit: Optional[int], offset: int) -> tuple:
+        """LIMIT/OFFSET parameters; SQLite takes a negative limit as no limit."""
+        return (-1 if limit is None else limit, offset)
+
+    def get_largest_files(self, limit: Optional[int] = 10, offset: int = 0) -> List[tuple]:
+        """Get the largest files by line count."""
+        return self.conn.execute(
+            "SELECT files.path, lines FROM file_info JOIN files ON files.id = file_info.file_id "
+            "ORDER BY lines DESC, file_id LIMIT ? OFFSET ?", self._page(limit, offset)).fetchall()
+
+    def get_most_imported_modules(self, limit: Optional[int] = 10, offset: int = 0) -> List[tuple]:
+        """Get the most imported modules."""
+        return self.conn.execute(
+            "SELECT module, COUNT(*) FROM imports GROUP BY module "
+            "ORDER BY COUNT(*) DESC, MIN(id) LIMIT ? OFFSET ?", self._page(limit, offset)).fetchall()
+
+    def get_files_by_io_count(self, limit: Optional[int] = 10, offset: int = 0) -> List[tuple]:
+        """Get files with the most I/O operations."""
+        return self.conn.execute(
+            "SELECT path, io_count FROM files ORDER BY io_count DESC, id LIMIT ? OFFSET ?", self._page(limit, offset)).fetchall()
@@ -0,0 +1,26 @@
+import unittest
+from module_resolver import ModuleResolver
+
+class ModuleResolverTest(unittest.TestCase):
+    def test_sibling_py_wins_over_root_pyw(self):
+        resolver = ModuleResolver(["pkg.pyw", "a/pkg.py", "a/x.py", "b/y.py"])
+        self.assertEqual(resolver.resolve("pkg", "a/x.py"), "a/pkg.py")
+        self.assertEqual(resolver.resolve("pkg", "b/y.py"), "pkg.pyw")
+
+    def test_root_wins_over_sibling_for_the_same_extension(self):
+        resolver = ModuleResolver(["pkg.py", "a/pkg.py", "a/x.py"])
+        self.assertEqual(resolver.resolve("pkg", "a/x.py"), "pkg.py")
+
+    def test_module_wins_over_package(self):
+        resolver = ModuleResolver(["pkg/__init__.py", "a/pkg.py", "a/x.py"])
+        self.assertEqual(resolver.resolve("pkg", "a/x.py"), "a/pkg.py")
+        self.assertEqual(resolver.resolve("pkg", "x.py"), "pkg/__init__.py")
+
+    def test_sibling_under_a_dotted_directory(self):
+        resolver = ModuleResolver(["v1.0/main.py", "v1.0/helper.py", "my.pkg/sub/__init__.py"])
+        self.assertEqual(resolver.resolve("helper", "v1.0/main.py"), "v1.0/helper.py")
+        self.assertEqual(resolver.resolve("sub", "my.pkg/x.py"), "my.pkg/sub/__init__.py")
+        self.assertIsNone(resolver.resolve("helper", "v1/main.py"))
+
+if __name__ == "__main__":
+    unittest.main()
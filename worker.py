@@ -3,28 +3,69 @@ import numpy as np
 import networkx as nx
 import matplotlib.pyplot as plt
 import sys
-from analyzer import analyze_file
+from analyzer import format_io_operation
+from analysis_cache import AnalysisCache
 from dependency_store import DependencyStore
+from exclusions import Exclusions
+from file_discovery import iter_py_files
+from pipeline import analyze_pipeline
+from progress import NORMAL, ProgressReporter
+from sharded_store import ShardedDependencyStore, shard_name
+from sqlite_store import SQLiteDependencyStore
 
-def find_py_files(path, exclude_dirs=None, exclude_files=None):
-    if exclude_dirs is None:
-        exclude_dirs = ["venv", ".git", "__pycache__"]
-    if exclude_files is None:
-        exclude_files = []
-    count = 0
-    py_files = []
-    for root, dirs, files in os.walk(path):
-        # Exclude unwanted directories in-place
-        dirs[:] = [d for d in dirs if d not in exclude_dirs]
-        for file in files:
-            if file in exclude_files:
-                continue
-            if file.endswith((".py", ".pyw")):
-                count += 1
-                py_files.append(os.path.join(root, file))
-    return py_files, count
+def iter_discovered_files(path, exclude_dirs=None, exclude_files=None, stats=None, exclude_patterns=None,
+                          use_gitignore=False):
+    """Stream the files find_py_files lists, as the walk finds them."""
+    exclusions = Exclusions.from_names(exclude_dirs, exclude_files, exclude_patterns or (), use_gitignore)
+    for entry in iter_py_files(path, exclusions, stat=stats is not None):
+        if stats is not None:
+            try:
+                stats[entry.path] = entry.stat()
+            except OSError:
+                pass
+        yield entry.path
+
+def find_py_files(path, exclude_dirs=None, exclude_files=None, stats=None, exclude_patterns=None, use_gitignore=False):
+    """
+    List the .py/.pyw files under path (see file_discovery.iter_py_files) and their count.
+    exclude_dirs/exclude_files hold directory/file names or glob patterns, exclude_patterns
+    gitignore-style patterns for both, and use_gitignore also applies the .gitignore files
+    found in the tree (see exclusions.Exclusions). If stats is a dict, it is filled with
+    each file's os.stat_result, taken during the walk.
+    """
+    py_files = list(iter_discovered_files(path, exclude_dirs, exclude_files, stats, exclude_patterns, use_gitignore))
+    return py_files, len(py_files)
+
+def analyze_files(py_files, workers=1, chunksize=None, cache=None, imports_only=False, stats=None):
+    """
+    Yield (file, analysis_result, error) for every file, in the same order as py_files.
+    Files are read on a thread pool and parsed on a process pool while earlier results
+    are consumed (see pipeline.analyze_pipeline).
+
+    Args:
+        * py_files (iterable): Paths of the files to analyze; may be a stream, which is
+          consumed as the pipeline has room
+        * workers (int): Number of worker processes; 1 analyzes serially in this process,
+          None uses os.cpu_count()
+        * chunksize (int): Files read and sent to a worker per task; None picks a size that
+          gives every worker a few chunks to balance the load
+        * cache (AnalysisCache): Optional cache; only files missing from it are analyzed.
+          Must not be shared between full and imports-only analyses
+        * imports_only (bool): Only extract imports (see analyzer.analyze_file)
+        * stats (dict): Optional path -> os.stat_result from discovery, saving the cache a
+          stat per file
+    """
+    return analyze_pipeline(py_files, workers=workers, chunksize=chunksize, cache=cache,
+                            imports_only=imports_only, stats=stats)
+
+def _open_cache(store, codebase_name, imports_only, shard=None):
+    """Analysis cache of a codebase (or one shard of it); imports-only results are kept apart from full ones."""
+    suffix = (f"_{shard}" if shard is not None else "") + ("_imports" if imports_only else "")
+    return AnalysisCache(store.output_dir, f"analysis_cache_{codebase_name}{suffix}.json")
 
-def dependency_store_maker(folder_path, exclude_dirs=None, exclude_files=None):
+def dependency_store_maker(folder_path, exclude_dirs=None, exclude_files=None, workers=1, chunksize=None,
+                           use_cache=True, imports_only=False, store=None, sharded=False, shards=None,
+                           exclude_patterns=None, use_gitignore=False, verbosity=NORMAL, progress=None):
     """
     Function from where works start
     here we call other funcs to analyze the whole codebase py/.pyw files
@@ -34,88 +75,192 @@ def dependency_store_maker(folder_path, exclude_dirs=None, exclude_files=None):
 
     Args:
         * folder_path (str): Path to repoistory/codebase/folder
-        * exclude_dirs (list): List of directory names to exclude
-        * exclude_files (list): List of file names to exclude
+        * exclude_dirs (list): List of directory names (or glob patterns, e.g. "build*") to exclude
+        * exclude_files (list): List of file names (or glob patterns, e.g. "*_pb2.py") to exclude
+        * workers (int): Worker processes used for analysis (1 = serial, None = all cores)
+        * chunksize (int): Files handed to a worker process at a time (None = automatic)
+        * use_cache (bool): Reuse analysis results of unchanged files from the previous run
+        * imports_only (bool): Only collect imports (enough for graph_maker), skipping the
+          much slower function usage and I/O analysis
+        * store: Store to fill; None creates an in-memory DependencyStore. Pass a
+          SQLiteDependencyStore for codebases too large to keep in memory; its database
+          (dependencies_<codebase>.sqlite unless named otherwise) is rebuilt from scratch
+        * sharded (bool): Keep one shard per top-level directory (ShardedDependencyStore),
+          each with its own analysis cache, saved under output_files/dependencies_<codebase>/
+        * shards (list): With sharded, only re-analyze these shards and keep the saved
+          others as they are (None = all)
+        * exclude_patterns (list): gitignore-style patterns excluding files and directories,
+          e.g. "build/", "pkg/generated/**"; excluded directories are never walked
+        * use_gitignore (bool): Also exclude whatever the codebase's .gitignore files list
+        * verbosity (int): Console output (progress.QUIET, NORMAL, VERBOSE or DEBUG); the
+          default NORMAL only prints errors and the summary, DEBUG every file's details
+        * progress: Path or open text file to write JSON-lines progress events to
+          (see progress.ProgressReporter)
     """
+    with ProgressReporter(verbosity, json_stream=progress) as reporter:
+        return _make_store(folder_path, exclude_dirs, exclude_files, workers, chunksize, use_cache, imports_only,
+                           store, sharded, shards, exclude_patterns, use_gitignore, reporter)
+
+def _make_store(folder_path, exclude_dirs, exclude_files, workers, chunksize, use_cache, imports_only, store,
+                sharded, shards, exclude_patterns, use_gitignore, reporter):
+    codebase_name = os.path.basename(os.path.abspath(folder_path)).replace(' ', '_')
+    output_filename = f"dependencies_{codebase_name}.json"
     # Initialize dependency store
-    store = DependencyStore()
+    if store is None:
+        store = ShardedDependencyStore() if sharded else DependencyStore()
+    elif isinstance(store, SQLiteDependencyStore):
+        # The database outlives the run: a full build starts it over, so deleted files don't linger
+        store.use_codebase(codebase_name)
+        store.clear()
+    if sharded:
+        # The saved manifest tells which shards to keep (or whose files to delete)
+        store.load(filename=output_filename)
     
     #find number of files in folder_path -- assumed that main is one of them
-    py_files, num_py_files = find_py_files(folder_path, exclude_dirs=exclude_dirs, exclude_files=exclude_files)
-    
-    # Normalize all file paths to be relative to codebase root and use forward slashes
+    stats = {} if use_cache else None
     codebase_root = os.path.abspath(folder_path)
-    for file in py_files:
-        rel_path = os.path.relpath(file, codebase_root).replace("\\", "/")
-        print(f"\nAnalyzing file: {file}")
-        try:
-            dependencies = analyze_file(file)
-            # Store dependencies with normalized relative path
-            store.add_file_dependencies(rel_path, dependencies)
-            
-            # Print analysis results
-            print("Dependencies found:")
-            print(f"Imports: {dependencies['imports']}")
-            print(f"I/O Operations: {dependencies['io_call_count']}")
-            
-            # Print file information if available
-            if 'file_info' in dependencies:
-                file_info = dependencies['file_info']
-                print(f"File Info: {file_info.get('lines', 'unknown')} lines, {file_info.get('size', 'unknown')} bytes")
-            
-            # Print I/O operations if available
-            if 'io_operations' in dependencies and dependencies['io_operations']:
-                print("I/O Operations Details:")
-                for op in dependencies['io_operations']:
-                    print(f"  - {op}")
-            
-            print("\nFunction/Class Usage:")
-            has_functions = False
-            for module, functions in dependencies['function_usage'].items():
-                if functions:  # If there are functions used
-                    has_functions = True
-                    print(f"  {module}:")
-                    for func in sorted(functions):
-                        print(f"    - {func}")
-            if not has_functions:
-                print("  NONE")
-                
-        except Exception as e:
-            print(f"Error analyzing {file}: {e}")
-            continue
-    
-    # Print summary statistics
-    summary = store.get_summary()
-    print(f"\n{'='*50}")
-    print("ANALYSIS SUMMARY")
-    print(f"{'='*50}")
-    print(f"Total files analyzed: {summary['total_files']}")
-    print(f"Total imports found: {summary['total_imports']}")
-    print(f"Total I/O operations: {summary['total_io_operations']}")
-    print(f"Total lines of code: {summary['total_lines']}")
-    print(f"Empty files: {summary['empty_files']}")
-    
-    # Show top statistics
-    print(f"\nTop 5 largest files:")
-    for file_path, lines in store.get_largest_files(5):
-        print(f"  {file_path}: {lines} lines")
+    if sharded:
+        py_files, _ = find_py_files(folder_path, exclude_dirs=exclude_dirs, exclude_files=exclude_files,
+                                    stats=stats, exclude_patterns=exclude_patterns,
+                                    use_gitignore=use_gitignore)
+        # Normalize all file paths to be relative to codebase root and use forward slashes
+        rel_paths = {file: os.path.relpath(file, codebase_root).replace("\\", "/") for file in py_files}
+        groups = {}
+        for file in py_files:
+            groups.setdefault(shard_name(rel_paths[file]), []).append(file)
+        if shards is not None:
+            groups = {name: files for name, files in groups.items() if name in shards}
+        # Drop shards of packages that no longer exist
+        for name in store.shard_names():
+            if name not in groups and (shards is None or name in shards):
+                store.drop_shard(name)
+    else:
+        # Discovery feeds the analysis pipeline directly: files are read and parsed while the walk goes on
+        py_files = []
+        rel_paths = {}
+
+        def discovered():
+            for file in iter_discovered_files(folder_path, exclude_dirs, exclude_files, stats, exclude_patterns,
+                                              use_gitignore):
+                py_files.append(file)
+                rel_paths[file] = os.path.relpath(file, codebase_root).replace("\\", "/")
+                yield file
+        groups = {None: discovered()}
     
-    print(f"\nTop 5 most imported modules:")
-    for module, count in store.get_most_imported_modules(5):
-        print(f"  {module}: imported by {count} files")
+    cache_stats = []
+    for shard, files in groups.items():
+        cache = _open_cache(store, codebase_name, imports_only, shard) if use_cache else None
+        target = store if shard is None else DependencyStore(store.output_dir)
+        for file, dependencies, error in analyze_files(files, workers=workers, chunksize=chunksize, cache=cache,
+                                                       imports_only=imports_only, stats=stats):
+            if error is not None:
+                reporter.file_failed(file, rel_paths[file], error)
+                continue
+            try:
+                # Store dependencies with normalized relative path
+                target.add_file_dependencies(rel_paths[file], dependencies)
+            except Exception as e:
+                reporter.file_failed(file, rel_paths[file], e)
+                continue
+            reporter.file_analyzed(file, rel_paths[file], dependencies)
+        if shard is not None:
+            store.set_shard(shard, target)
+        if cache is not None:
+            cache.prune(py_files if shard is None else files)
+            cache.save()
+            cache_stats.append((shard, cache))
+    num_py_files = len(py_files)
     
-    print(f"\nTop 5 files with most I/O operations:")
-    for file_path, count in store.get_files_by_io_count(5):
-        print(f"  {file_path}: {count} I/O operations")
+    reporter.summary(store)
+    for shard, cache in cache_stats:
+        reporter.cache_stats(shard, cache)
     
     # Save dependencies to file
-    codebase_name = os.path.basename(os.path.abspath(folder_path)).replace(' ', '_')
-    output_filename = f"dependencies_{codebase_name}.json"
     output_path = store.save(filename=output_filename)
-    print(f"\nDependencies saved to: {output_path}")
+    reporter.saved(output_path)
     
     return store, num_py_files
 
+def dependency_store_updater(folder_path, changed_files=(), added_files=(), deleted_files=(), store=None,
+                             workers=1, chunksize=None, use_cache=True, imports_only=False, sharded=False,
+                             verbosity=NORMAL, progress=None, exclude_dirs=None, exclude_files=None,
+                             exclude_patterns=None, use_gitignore=False):
+    """
+    Incrementally update the dependency store of a codebase after some files changed,
+    instead of re-analyzing the whole codebase with dependency_store_maker.
+    Only changed/added files are analyzed; the saved store is patched and re-saved.
+
+    Args:
+        * folder_path (str): Path to repoistory/codebase/folder
+        * changed_files (list): Modified files (absolute, or relative to folder_path)
+        * added_files (list): New files
+        * deleted_files (list): Files that were removed
+        * store (DependencyStore): Store to update; None loads the one saved by dependency_store_maker
+        * workers, chunksize, use_cache, imports_only, sharded: As in dependency_store_maker;
+          with sharded, only the shards of the given files are rewritten
+        * verbosity, progress: Console output and JSON-lines progress events, as in
+          dependency_store_maker
+        * exclude_dirs, exclude_files, exclude_patterns, use_gitignore: As in
+          dependency_store_maker; changed and added files they exclude are skipped, and a
+          codebase without a saved store is analyzed with them
+    """
+    with ProgressReporter(verbosity, json_stream=progress) as reporter:
+        return _update_store(folder_path, changed_files, added_files, deleted_files, store, workers, chunksize,
+                             use_cache, imports_only, sharded, exclude_dirs, exclude_files, exclude_patterns,
+                             use_gitignore, reporter)
+
+def _update_store(folder_path, changed_files, added_files, deleted_files, store, workers, chunksize, use_cache,
+                  imports_only, sharded, exclude_dirs, exclude_files, exclude_patterns, use_gitignore, reporter):
+    codebase_root = os.path.abspath(folder_path)
+    codebase_name = os.path.basename(codebase_root).replace(' ', '_')
+    output_filename = f"dependencies_{codebase_name}.json"
+    if store is None:
+        store = ShardedDependencyStore() if sharded else DependencyStore()
+        if not store.load(filename=output_filename):
+            reporter.message(f"No saved dependencies found for {codebase_name}, analyzing the whole codebase")
+            store, _ = _make_store(folder_path, exclude_dirs, exclude_files, workers, chunksize, use_cache,
+                                   imports_only, None, sharded, None, exclude_patterns, use_gitignore, reporter)
+            return store
+    elif isinstance(store, SQLiteDependencyStore):
+        store.use_codebase(codebase_name)
+
+    def to_rel_path(file):
+        return os.path.relpath(os.path.join(codebase_root, file), codebase_root).replace("\\", "/")
+
+    # Analyze with the same path form find_py_files would produce, so file_info matches a full run
+    exclusions = Exclusions.from_names(exclude_dirs, exclude_files, exclude_patterns or (), use_gitignore)
+    to_analyze = {}
+    for file in list(changed_files) + list(added_files):
+        rel_path = to_rel_path(file)
+        if exclusions.excludes_file(codebase_root, rel_path):
+            continue
+        to_analyze[os.path.join(folder_path, *rel_path.split("/"))] = rel_path
+
+    # A sharded store keeps one analysis cache per shard
+    groups = {}
+    for file, rel_path in to_analyze.items():
+        shard = shard_name(rel_path) if isinstance(store, ShardedDependencyStore) else None
+        groups.setdefault(shard, []).append(file)
+    updated = {}
+    for shard, files in groups.items():
+        cache = _open_cache(store, codebase_name, imports_only, shard) if use_cache else None
+        for file, dependencies, error in analyze_files(files, workers=workers, chunksize=chunksize, cache=cache,
+                                                       imports_only=imports_only):
+            if error is not None:
+                reporter.file_failed(file, to_analyze[file], error)
+                continue
+            updated[to_analyze[file]] = dependencies
+            reporter.file_analyzed(file, to_analyze[file], dependencies)
+        if cache is not None:
+            cache.save()
+
+    counts = store.update_files(updated, deleted=[to_rel_path(file) for file in deleted_files])
+    output_path = store.save(filename=output_filename)
+    reporter.event("update", **counts)
+    reporter.saved(output_path, f"Dependencies updated ({counts['added']} added, {counts['replaced']} replaced, "
+                                f"{counts['removed']} removed) and saved to: {output_path}")
+    return store
+
 def load_prebuilt_libs(filepath="prebuilt_libs.txt"):
     if not os.path.exists(filepath):
         return set()
@@ -130,31 +275,7 @@ def graph_maker(dependency_store, main_folder_path, main_file_path, prebuilt_lib
     stdlib_modules = set(sys.stdlib_module_names)
     main_file_rel = main_file_path
     prebuilt_libs = load_prebuilt_libs(prebuilt_libs_path)
-    all_deps = dependency_store.get_all_dependencies()["files"]
-
-    def normalize_path(p):
-        p = p.replace("\\", "/")
-        while p.startswith("./") or p.startswith("../"):
-            p = p[p.find("/")+1:]
-        return p.lower()
-
-    normalized_all_deps = {normalize_path(k): k for k in all_deps}
-
-    def module_to_file_path(module_name, parent_file=None):
-        # Try root-level first
-        for ext in ('.py', '.pyw'):
-            candidate = module_name.replace('.', '/') + ext
-            norm_candidate = normalize_path(candidate)
-            if norm_candidate in normalized_all_deps:
-                return normalized_all_deps[norm_candidate]
-            # Try relative to parent file's directory
-            if parent_file:
-                parent_dir = os.path.dirname(parent_file)
-                candidate2 = os.path.join(parent_dir, candidate)
-                norm_candidate2 = normalize_path(candidate2)
-                if norm_candidate2 in normalized_all_deps:
-                    return normalized_all_deps[norm_candidate2]
-        return None
+    module_to_file_path = dependency_store.module_resolver().resolve
 
     visited = set()
     def add_dependencies(node, file_path_lookup=None):
@@ -164,7 +285,7 @@ def graph_maker(dependency_store, main_folder_path, main_file_path, prebuilt_lib
             return
         visited.add(node)
         file_path = file_path_lookup if file_path_lookup else node
-        deps = all_deps.get(file_path, {})
+        deps = dependency_store.get_file_dependencies(file_path)
         imports = deps.get("imports", [])
         for module in imports:
             target_file = module_to_file_path(module, file_path)
@@ -186,7 +307,6 @@ def graph_maker(dependency_store, main_folder_path, main_file_path, prebuilt_lib
     add_dependencies(main_file_rel)
 
     # --- Add node attributes ---
-    all_imports = set(imp for deps in all_deps.values() for imp in deps.get("imports", []))
     for node in G.nodes():
         if node == main_file_rel:
             G.nodes[node]['name'] = os.path.basename(node)
@@ -279,7 +399,7 @@ def graph_maker(dependency_store, main_folder_path, main_file_path, prebuilt_lib
         if main_file_io:
             f.write(f"\n--- I/O Operations in {main_file_rel} ---\n")
             for op in main_file_io:
-                f.write(f"{op}\n")
+                f.write(f"{format_io_operation(op)}\n")
         
         f.write("---------------------------\n")
     print(f"Detailed dependencies saved to: {output_filepath}")